@@ -1,21 +1,85 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
+import time
+_import_started = time.perf_counter()
+
+from flask import Blueprint, Flask, current_app, render_template, request, redirect, url_for, flash, session, jsonify, g
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 from bson.objectid import ObjectId
 import os
 from dotenv import load_dotenv
 
-from db import users_collection, artworks_collection, comments_collection, likes_collection
+import db
+from db import get_collection, read_collection, use_primary_reads, reset_primary_reads, MAX_STALENESS_SECONDS
+from models.feed import hydrate_artworks, get_artwork_page
+from models.like import add_like, remove_like, toggle_like as toggle_user_like
+from models.artwork import build_search_query, search_artworks
+from models.user import get_user_by_id, update_user, user_cache
+from models.comment import get_comment_page
+from models.counters import increment_comments
+from models.records import Artwork, Like
+from models.facets import apply_facet_changes, facet_fields, get_facet_counts
+from models.follow import follow, unfollow, toggle_follow as toggle_user_follow, is_following
+from models.timeline import get_timeline_page
+from models.ranking import (RANKINGS, RANKING_REFRESH_SECONDS, build_missing_rankings,
+                            get_ranking_page, ranking_age, claim_refresh)
+from render_cache import cached_page, conditional_page, render_cards, bump_content_version, backend as render_cache_backend
+from indexes import ensure_indexes, check_query_plans
+from commands import register_commands
+from async_db import run_async
+import instrumentation
+import media
+import static_assets
+import jobs
+import live
+import tasks
+import async_pages
 from datetime import datetime, timezone
 
 load_dotenv()
+_import_seconds = time.perf_counter() - _import_started
+
+bp = Blueprint('main', __name__)
+
+instrumentation.metrics.register_gauge(
+    'app_cache_hits', 'Cache hits in this process.',
+    lambda: {'cache="user"': user_cache.hits}
+)
+instrumentation.metrics.register_gauge(
+    'app_cache_misses', 'Cache misses in this process.',
+    lambda: {'cache="user"': user_cache.misses}
+)
+instrumentation.metrics.register_gauge(
+    'app_jobs', 'Background jobs by state (per process for the thread backend).',
+    lambda: {f'state="{state}"': count for state, count in jobs.get_queue().stats().items()}
+)
+instrumentation.metrics.register_gauge(
+    'app_live_subscribers', 'Open live event streams in this process.',
+    lambda: {'': live.hub.subscribers}
+)
 
-app = Flask(__name__)
-app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev')
+# -- read routing
+# With READ_PREFERENCE=secondaryPreferred, a client that wrote something in
+# the last READ_YOUR_WRITES_SECONDS reads from the primary so it sees it.
+@bp.before_app_request
+def route_reads():
+    wrote_at = session.get('wrote_at')
+    if wrote_at and time.time() - wrote_at < current_app.config['READ_YOUR_WRITES_SECONDS']:
+        g.primary_reads_token = use_primary_reads()
+
+@bp.after_app_request
+def remember_writes(response):
+    if current_app.config['READ_PREFERENCE'] != 'primary' and request.method in ('POST', 'PUT', 'DELETE') and response.status_code < 400:
+        session['wrote_at'] = time.time()
+    return response
+
+@bp.teardown_app_request
+def reset_read_routing(exc):
+    token = g.pop('primary_reads_token', None)
+    if token is not None:
+        reset_primary_reads(token)
 
 login_manager = LoginManager()
-login_manager.init_app(app)
-login_manager.login_view = 'login'
+login_manager.login_view = 'main.login'
 
 class User(UserMixin):
     def __init__(self, user_data):
@@ -29,46 +93,120 @@ class User(UserMixin):
 
 @login_manager.user_loader
 def load_user(user_id):
-    try:
-        user_data = users_collection.find_one({"_id": ObjectId(user_id)})
-        if user_data:
-            return User(user_data)
-    except:
-        pass
+    user_data = get_user_by_id(user_id)
+    if user_data:
+        return User(user_data)
     return None
 
 def get_user_by_email(email):
-    return users_collection.find_one({"email": email})
+    return get_collection("users").find_one({"email": email})
 
-def get_user_by_id(user_id):
+def get_artwork_by_id(artwork_id, collection=None):
     try:
-        return users_collection.find_one({"_id": ObjectId(user_id)})
+        return (collection if collection is not None else get_collection("artworks")).find_one({"_id": ObjectId(artwork_id)})
     except:
         return None
 
-def get_artwork_by_id(artwork_id):
-    try:
-        return artworks_collection.find_one({"_id": ObjectId(artwork_id)})
-    except:
-        return None
+def get_viewer_id():
+    return current_user.id if current_user.is_authenticated else None
+
+def get_feed_page(query=None, with_artist=True, card_template='artwork_card.html'):
+    """Load, hydrate and pre-render one page of artworks using the ?cursor= request arg"""
+    if current_app.config['ASYNC_READS']:
+        artworks, next_cursor = run_async(async_pages.load_feed_page(
+            query,
+            cursor=request.args.get('cursor'),
+            limit=current_app.config['FEED_PAGE_SIZE'],
+            viewer_id=get_viewer_id(),
+            with_artist=with_artist
+        ))
+    else:
+        artworks, next_cursor = get_artwork_page(
+            query,
+            cursor=request.args.get('cursor'),
+            limit=current_app.config['FEED_PAGE_SIZE']
+        )
+        hydrate_artworks(artworks, viewer_id=get_viewer_id(), with_artist=with_artist)
+    render_cards(artworks, card_template)
+    return artworks, next_cursor
 
-@app.route('/')
+@bp.route('/')
+@conditional_page
+@cached_page
 def index():
-    artworks = list(artworks_collection.find().sort("created_at", -1))
+    artworks, next_cursor = get_feed_page()
     
-    for artwork in artworks:
-        artwork['artist'] = get_user_by_id(artwork['artist_id'])
-        artwork['likes_count'] = likes_collection.count_documents({"artwork_id": artwork['_id']})
-        artwork['comments_count'] = comments_collection.count_documents({"artwork_id": artwork['_id']})
-        if current_user.is_authenticated:
-            artwork['user_liked'] = likes_collection.find_one({
-                "artwork_id": artwork['_id'], 
-                "user_id": ObjectId(current_user.id)
-            }) is not None
+    return render_template('home.html', artworks=artworks, next_cursor=next_cursor, tab='latest')
+
+@bp.route('/api/feed')
+@cached_page
+def feed_page():
+    """Next page of the home feed as a grid fragment"""
+    artworks, next_cursor = get_feed_page()
+    html = render_template('artwork_grid.html', artworks=artworks)
+    return jsonify({'success': True, 'html': html, 'next_cursor': next_cursor})
+
+def get_timeline_feed():
+    """Return (artworks, next_cursor) for the current user's following timeline"""
+    artworks, next_cursor = get_timeline_page(current_user.id, request.args.get('cursor'),
+                                              current_app.config['FEED_PAGE_SIZE'])
+    hydrate_artworks(artworks, viewer_id=current_user.id)
+    render_cards(artworks)
+    return artworks, next_cursor
+
+@bp.route('/following')
+@login_required
+def following():
+    """New artworks from the artists the current user follows"""
+    artworks, next_cursor = get_timeline_feed()
+    
+    return render_template('home.html', artworks=artworks, next_cursor=next_cursor, tab='following')
+
+@bp.route('/api/following')
+@login_required
+def following_page():
+    """Next page of the following timeline as a grid fragment"""
+    artworks, next_cursor = get_timeline_feed()
+    html = render_template('artwork_grid.html', artworks=artworks)
+    return jsonify({'success': True, 'html': html, 'next_cursor': next_cursor})
+
+def get_ranking_feed(name):
+    """Return (artworks, next_cursor) for a ranking, queueing a refresh when it is old
+
+    Past RANKING_REFRESH_SECONDS (or if it was never built) the ranking is
+    refreshed by a background job while the current one, possibly empty, is
+    served. The aggregation never runs in the request.
+    """
+    age = ranking_age(name)
+    if (age is None or age > RANKING_REFRESH_SECONDS) and claim_refresh(name):
+        tasks.refresh_ranking_job.delay(name=name)
+    
+    artworks, next_cursor = get_ranking_page(name, request.args.get('cursor'), current_app.config['FEED_PAGE_SIZE'])
+    hydrate_artworks(artworks, viewer_id=get_viewer_id())
+    render_cards(artworks)
+    return artworks, next_cursor
+
+@bp.route('/trending', defaults={'ranking': 'trending'})
+@bp.route('/popular', defaults={'ranking': 'popular'})
+@conditional_page
+@cached_page
+def ranking(ranking):
+    """Trending or most liked artworks"""
+    artworks, next_cursor = get_ranking_feed(ranking)
     
-    return render_template('home.html', artworks=artworks)
+    return render_template('home.html', artworks=artworks, next_cursor=next_cursor, tab=ranking)
 
-@app.route('/signup', methods=['GET', 'POST'])
+@bp.route('/api/rankings/<ranking>')
+@cached_page
+def ranking_page(ranking):
+    """Next page of a ranking as a grid fragment"""
+    if ranking not in RANKINGS:
+        return jsonify({'success': False, 'error': 'Unknown ranking'}), 404
+    artworks, next_cursor = get_ranking_feed(ranking)
+    html = render_template('artwork_grid.html', artworks=artworks)
+    return jsonify({'success': True, 'html': html, 'next_cursor': next_cursor})
+
+@bp.route('/signup', methods=['GET', 'POST'])
 def signup():
     """User registration"""
     if request.method == 'POST':
@@ -78,11 +216,11 @@ def signup():
         
         if not username or not email or not password:
             flash('All fields are required', 'error')
-            return redirect(url_for('signup'))
+            return redirect(url_for('main.signup'))
         
         if get_user_by_email(email):
             flash('Email already registered', 'error')
-            return redirect(url_for('signup'))
+            return redirect(url_for('main.signup'))
         
         password_hash = generate_password_hash(password)
         user_data = {
@@ -95,14 +233,14 @@ def signup():
             "social_links": {},
             "created_at": datetime.now(timezone.utc)
         }
-        users_collection.insert_one(user_data)
+        get_collection("users").insert_one(user_data)
         
         flash('Account created successfully! Please log in.', 'success')
-        return redirect(url_for('login'))
+        return redirect(url_for('main.login'))
     
     return render_template('signup.html')
 
-@app.route('/login', methods=['GET', 'POST'])
+@bp.route('/login', methods=['GET', 'POST'])
 def login():
     """User login"""
     if request.method == 'POST':
@@ -115,37 +253,62 @@ def login():
             user = User(user_data)
             login_user(user)
             flash('Logged in successfully!', 'success')
-            return redirect(url_for('index'))
+            return redirect(url_for('main.index'))
         else:
             flash('Invalid email or password', 'error')
     
     return render_template('login.html')
 
-@app.route('/logout')
+@bp.route('/logout')
 @login_required
 def logout():
     """User logout"""
     logout_user()
     flash('Logged out successfully', 'success')
-    return redirect(url_for('index'))
+    return redirect(url_for('main.index'))
 
-@app.route('/profile/<user_id>')
+@bp.route('/profile/<user_id>')
+@conditional_page
+@cached_page
 def profile(user_id):
     """View user profile"""
-    user_data = get_user_by_id(user_id)
+    if current_app.config['ASYNC_READS']:
+        user_data, artworks, next_cursor, artworks_count = run_async(async_pages.load_profile(
+            user_id,
+            cursor=request.args.get('cursor'),
+            limit=current_app.config['FEED_PAGE_SIZE'],
+            viewer_id=get_viewer_id()
+        ))
+        render_cards(artworks, 'profile_artwork_card.html')
+    else:
+        user_data = get_user_by_id(user_id)
+        if user_data:
+            artworks, next_cursor = get_feed_page({"artist_id": user_id}, with_artist=False,
+                                                   card_template='profile_artwork_card.html')
+            artworks_count = read_collection("artworks").count_documents({"artist_id": user_id})
+    
     if not user_data:
         flash('User not found', 'error')
-        return redirect(url_for('index'))
-    
-    artworks = list(artworks_collection.find({"artist_id": user_id}).sort("created_at", -1))
+        return redirect(url_for('main.index'))
     
-    for artwork in artworks:
-        artwork['likes_count'] = likes_collection.count_documents({"artwork_id": artwork['_id']})
-        artwork['comments_count'] = comments_collection.count_documents({"artwork_id": artwork['_id']})
-    
-    return render_template('profile.html', user=user_data, artworks=artworks)
+    user_following = current_user.is_authenticated and is_following(current_user.id, user_data['_id'])
+    return render_template('profile.html', 
+                         user=user_data, 
+                         artworks=artworks,
+                         artworks_count=artworks_count,
+                         next_cursor=next_cursor,
+                         user_following=user_following)
+
+@bp.route('/api/profile/<user_id>/artworks')
+@cached_page
+def profile_artworks_page(user_id):
+    """Next page of a profile's artworks as a grid fragment"""
+    artworks, next_cursor = get_feed_page({"artist_id": user_id}, with_artist=False,
+                                           card_template='profile_artwork_card.html')
+    html = render_template('profile_artwork_grid.html', artworks=artworks)
+    return jsonify({'success': True, 'html': html, 'next_cursor': next_cursor})
 
-@app.route('/profile/edit', methods=['GET', 'POST'])
+@bp.route('/profile/edit', methods=['GET', 'POST'])
 @login_required
 def edit_profile():
     """Edit current user's profile"""
@@ -160,17 +323,15 @@ def edit_profile():
                 'website': request.form.get('website', '')
             }
         }
-        users_collection.update_one(
-            {"_id": ObjectId(current_user.id)},
-            {"$set": update_data}
-        )
+        update_user(current_user.id, update_data)
+        bump_content_version()
         flash('Profile updated successfully!', 'success')
-        return redirect(url_for('profile', user_id=current_user.id))
+        return redirect(url_for('main.profile', user_id=current_user.id))
     
     user_data = get_user_by_id(current_user.id)
     return render_template('edit_profile.html', user=user_data)
 
-@app.route('/artwork/add', methods=['GET', 'POST'])
+@bp.route('/artwork/add', methods=['GET', 'POST'])
 @login_required
 def add_artwork_route():
     """Add new artwork"""
@@ -178,6 +339,16 @@ def add_artwork_route():
         title = request.form.get('title')
         description = request.form.get('description')
         image_url = request.form.get('image_url')
+        image_file = request.files.get('image_file')
+        if image_file and image_file.filename:
+            try:
+                image_url = media.save_original(image_file.read())
+            except (ValueError, RuntimeError) as e:
+                flash(str(e), 'error')
+                return render_template('add_artwork.html')
+        if not image_url:
+            flash('Please provide an image URL or upload an image', 'error')
+            return render_template('add_artwork.html')
         tags = [tag.strip() for tag in request.form.get('tags', '').split(',') if tag.strip()]
         medium = request.form.get('medium')
         year = request.form.get('year', type=int)
@@ -194,45 +365,80 @@ def add_artwork_route():
             "year": year,
             "price": price,
             "process_images": process_images,
+            "likes_count": 0,
+            "comments_count": 0,
             "created_at": datetime.now(timezone.utc)
         }
-        artworks_collection.insert_one(artwork_data)
+        result = get_collection("artworks").insert_one(artwork_data)
+        # inline, not a job: jobs can run twice and $inc isn't idempotent
+        apply_facet_changes(after=facet_fields(artwork_data))
+        bump_content_version()
+        tasks.fan_out_artwork.delay(artwork_id=str(result.inserted_id))
+        tasks.process_artwork_image.delay(artwork_id=str(result.inserted_id), image_url=image_url)
         
         flash('Artwork added successfully!', 'success')
-        return redirect(url_for('profile', user_id=current_user.id))
+        return redirect(url_for('main.profile', user_id=current_user.id))
     
     return render_template('add_artwork.html')
 
-@app.route('/artwork/<artwork_id>')
+@bp.route('/artwork/<artwork_id>')
+@conditional_page
 def artwork_detail(artwork_id):
     """View artwork details"""
-    artwork = get_artwork_by_id(artwork_id)
-    if not artwork:
-        flash('Artwork not found', 'error')
-        return redirect(url_for('index'))
-    
-    artist = get_user_by_id(artwork['artist_id'])
-    comments = list(comments_collection.find({"artwork_id": ObjectId(artwork_id)}).sort("created_at", 1))
-    
-    for comment in comments:
-        comment['user'] = get_user_by_id(str(comment['user_id']))
+    if current_app.config['ASYNC_READS']:
+        artwork, artist, comments, next_comments_cursor, user_liked = run_async(
+            async_pages.load_artwork_detail(artwork_id, viewer_id=get_viewer_id(),
+                                            comments_limit=current_app.config['COMMENTS_PAGE_SIZE'])
+        )
+        if not artwork:
+            flash('Artwork not found', 'error')
+            return redirect(url_for('main.index'))
+    else:
+        try:
+            artwork = Artwork.from_doc(read_collection("artworks").find_one(
+                {"_id": ObjectId(artwork_id)}, Artwork.projection("detail")
+            ))
+        except Exception:
+            artwork = None
+        if not artwork:
+            flash('Artwork not found', 'error')
+            return redirect(url_for('main.index'))
+        
+        artist = get_user_by_id(artwork['artist_id'])
+        comments, next_comments_cursor = get_comment_page(artwork['_id'], limit=current_app.config['COMMENTS_PAGE_SIZE'])
+        
+        user_liked = False
+        if current_user.is_authenticated:
+            user_liked = read_collection("likes").find_one({
+                "artwork_id": ObjectId(artwork_id),
+                "user_id": ObjectId(current_user.id)
+            }, Like.projection("exists")) is not None
     
-    likes_count = likes_collection.count_documents({"artwork_id": ObjectId(artwork_id)})
-    user_liked = False
-    if current_user.is_authenticated:
-        user_liked = likes_collection.find_one({
-            "artwork_id": ObjectId(artwork_id),
-            "user_id": ObjectId(current_user.id)
-        }) is not None
+    likes_count = artwork.get('likes_count', 0)
     
     return render_template('artwork_detail.html', 
                          artwork=artwork, 
                          artist=artist, 
                          comments=comments,
+                         next_comments_cursor=next_comments_cursor,
                          likes_count=likes_count,
                          user_liked=user_liked)
 
-@app.route('/artwork/<artwork_id>/edit', methods=['GET', 'POST'])
+@bp.route('/api/artwork/<artwork_id>/comments')
+def comments_page(artwork_id):
+    """Next page of an artwork's comments as an HTML fragment"""
+    try:
+        comments, next_cursor = get_comment_page(
+            ObjectId(artwork_id),
+            cursor=request.args.get('cursor'),
+            limit=current_app.config['COMMENTS_PAGE_SIZE']
+        )
+        html = render_template('comment_list.html', comments=comments)
+        return jsonify({'success': True, 'html': html, 'next_cursor': next_cursor})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+@bp.route('/artwork/<artwork_id>/edit', methods=['GET', 'POST'])
 @login_required
 def edit_artwork(artwork_id):
     """Edit artwork"""
@@ -240,29 +446,45 @@ def edit_artwork(artwork_id):
     
     if not artwork or str(artwork['artist_id']) != current_user.id:
         flash('Unauthorized access', 'error')
-        return redirect(url_for('index'))
+        return redirect(url_for('main.index'))
     
     if request.method == 'POST':
+        image_url = request.form.get('image_url') or artwork.get('image_url')
+        image_file = request.files.get('image_file')
+        if image_file and image_file.filename:
+            try:
+                image_url = media.save_original(image_file.read())
+            except (ValueError, RuntimeError) as e:
+                flash(str(e), 'error')
+                return render_template('edit_artwork.html', artwork=artwork)
+
         update_data = {
             'title': request.form.get('title'),
             'description': request.form.get('description'),
-            'image_url': request.form.get('image_url'),
+            'image_url': image_url,
             'tags': [tag.strip() for tag in request.form.get('tags', '').split(',') if tag.strip()],
             'medium': request.form.get('medium'),
             'year': request.form.get('year', type=int),
             'price': request.form.get('price', type=float),
-            'process_images': [img.strip() for img in request.form.get('process_images', '').split(',') if img.strip()]
+            'process_images': [img.strip() for img in request.form.get('process_images', '').split(',') if img.strip()],
+            'updated_at': datetime.now(timezone.utc)
         }
-        artworks_collection.update_one(
-            {"_id": ObjectId(artwork_id)},
-            {"$set": update_data}
-        )
+        update = {"$set": update_data}
+        image_changed = image_url != artwork.get('image_url')
+        if image_changed:
+            # old variants belong to the previous image
+            update["$unset"] = {"image_variants": ""}
+        get_collection("artworks").update_one({"_id": ObjectId(artwork_id)}, update)
+        apply_facet_changes(before=facet_fields(artwork), after=facet_fields(update_data))
+        bump_content_version()
+        if image_changed or not artwork.get('image_variants'):
+            tasks.process_artwork_image.delay(artwork_id=artwork_id, image_url=image_url)
         flash('Artwork updated successfully!', 'success')
-        return redirect(url_for('artwork_detail', artwork_id=artwork_id))
+        return redirect(url_for('main.artwork_detail', artwork_id=artwork_id))
     
     return render_template('edit_artwork.html', artwork=artwork)
 
-@app.route('/artwork/<artwork_id>/delete', methods=['POST'])
+@bp.route('/artwork/<artwork_id>/delete', methods=['POST'])
 @login_required
 def delete_artwork_route(artwork_id):
     """Delete artwork"""
@@ -270,71 +492,152 @@ def delete_artwork_route(artwork_id):
     
     if not artwork or str(artwork['artist_id']) != current_user.id:
         flash('Unauthorized access', 'error')
-        return redirect(url_for('index'))
+        return redirect(url_for('main.index'))
     
-    artworks_collection.delete_one({"_id": ObjectId(artwork_id)})
+    if get_collection("artworks").delete_one({"_id": ObjectId(artwork_id)}).deleted_count:
+        apply_facet_changes(before=facet_fields(artwork))
+        # likes and comments can number in the thousands; remove them in batches off the request
+        tasks.cascade_delete_artwork.delay(artwork_id=artwork_id)
+    bump_content_version()
     flash('Artwork deleted successfully!', 'success')
-    return redirect(url_for('profile', user_id=current_user.id))
+    return redirect(url_for('main.profile', user_id=current_user.id))
 
-@app.route('/search')
-def search():
-    """Search artworks"""
-    keyword = request.args.get('q', '')
+def get_search_page():
+    """Run the search for the current request args and return (artworks, next_cursor)
+
+    Keyword searches are ranked by text score and paged by page number in the
+    cursor; filter-only searches reuse the keyset-paginated feed.
+    """
+    keyword = request.args.get('q', '').strip()
     medium = request.args.get('medium', '')
     year = request.args.get('year', type=int)
+    tags = request.args.getlist('tag')
     
-    query = {}
-    
-    if keyword:
-        query = {"$or": [
-            {"title": {"$regex": keyword, "$options": "i"}},
-            {"description": {"$regex": keyword, "$options": "i"}},
-            {"tags": {"$regex": keyword, "$options": "i"}}
-        ]}
+    if not keyword:
+        return get_feed_page(build_search_query(medium=medium, year=year, tags=tags))
     
-    if medium:
-        query["medium"] = medium
-    if year:
-        query["year"] = year
+    page = max(request.args.get('cursor', 1, type=int), 1)
+    per_page = current_app.config['FEED_PAGE_SIZE']
+    artworks = search_artworks(keyword, medium, year, skip=(page - 1) * per_page, limit=per_page + 1, tags=tags)
     
-    artworks = list(artworks_collection.find(query))
-    
-    for artwork in artworks:
-        artwork['artist'] = get_user_by_id(artwork['artist_id'])
-        artwork['likes_count'] = likes_collection.count_documents({"artwork_id": artwork['_id']})
+    next_cursor = None
+    if len(artworks) > per_page:
+        artworks = artworks[:per_page]
+        next_cursor = str(page + 1)
+    hydrate_artworks(artworks, viewer_id=get_viewer_id())
+    render_cards(artworks)
+    return artworks, next_cursor
+
+@bp.route('/search')
+@conditional_page
+@cached_page
+def search():
+    """Search artworks"""
+    keyword = request.args.get('q', '')
+    artworks, next_cursor = get_search_page()
     
-    return render_template('search_results.html', artworks=artworks, query=keyword)
+    return render_template('search_results.html', 
+                         artworks=artworks, 
+                         query=keyword,
+                         next_cursor=next_cursor,
+                         facets=get_facet_counts())
+
+@bp.route('/browse')
+@conditional_page
+@cached_page
+def browse():
+    """Browse artworks by any combination of tags, medium and year"""
+    artworks, next_cursor = get_search_page()
+    return render_template('search_results.html',
+                         artworks=artworks,
+                         query='',
+                         next_cursor=next_cursor,
+                         facets=get_facet_counts())
+
+# facet name -> query argument
+FACET_ARGS = {'tag': 'tag', 'medium': 'medium', 'year': 'year'}
 
-@app.route('/api/artwork/<artwork_id>/like', methods=['POST'])
+@bp.app_template_global()
+def facet_selected(facet, value):
+    return str(value) in request.args.getlist(FACET_ARGS[facet])
+
+@bp.app_template_global()
+def facet_url(facet, value):
+    """URL of the current search/browse page with one facet value toggled"""
+    args = request.args.to_dict(flat=False)
+    args.pop('cursor', None)
+    key = FACET_ARGS[facet]
+    selected = args.get(key, [])
+    if str(value) in selected:
+        selected = [v for v in selected if v != str(value)]
+    elif facet == 'tag':
+        selected = selected + [str(value)]
+    else:
+        selected = [str(value)]  # medium and year take one value
+    args[key] = selected
+    endpoint = 'main.search' if args.get('q', [''])[0] else 'main.browse'
+    return url_for(endpoint, **{k: v for k, v in args.items() if v})
+
+@bp.route('/api/search')
+@cached_page
+def search_page():
+    """Next page of search results as a grid fragment"""
+    artworks, next_cursor = get_search_page()
+    html = render_template('artwork_grid.html', artworks=artworks)
+    return jsonify({'success': True, 'html': html, 'next_cursor': next_cursor})
+
+@bp.route('/api/artwork/<artwork_id>/like', methods=['POST', 'PUT', 'DELETE'])
 @login_required
 def toggle_like(artwork_id):
-    """Toggle like on artwork"""
+    """Like (PUT), unlike (DELETE) or toggle (POST) an artwork
+
+    PUT and DELETE are idempotent, so clients can safely retry them.
+    """
     try:
         artwork_obj_id = ObjectId(artwork_id)
-        user_obj_id = ObjectId(current_user.id)
         
-        existing_like = likes_collection.find_one({
-            "artwork_id": artwork_obj_id,
-            "user_id": user_obj_id
-        })
+        if request.method == 'PUT':
+            result = add_like(artwork_obj_id, current_user.id)
+        elif request.method == 'DELETE':
+            result = remove_like(artwork_obj_id, current_user.id)
+        else:
+            result = toggle_user_like(artwork_obj_id, current_user.id)
+        
+        if result['changed']:
+            bump_content_version()
+        return jsonify({'success': True, 'liked': result['liked'], 'likes_count': result['likes_count']})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+@bp.route('/api/user/<user_id>/follow', methods=['POST', 'PUT', 'DELETE'])
+@login_required
+def toggle_follow(user_id):
+    """Follow (PUT), unfollow (DELETE) or toggle (POST) an artist"""
+    try:
+        artist_id = ObjectId(user_id)
+        if user_id == current_user.id:
+            return jsonify({'success': False, 'error': 'You cannot follow yourself'}), 400
+        if not get_user_by_id(user_id):
+            return jsonify({'success': False, 'error': 'User not found'}), 404
         
-        if existing_like:
-            likes_collection.delete_one({"_id": existing_like['_id']})
-            liked = False
+        if request.method == 'PUT':
+            result = follow(current_user.id, artist_id)
+        elif request.method == 'DELETE':
+            result = unfollow(current_user.id, artist_id)
         else:
-            likes_collection.insert_one({
-                "artwork_id": artwork_obj_id,
-                "user_id": user_obj_id,
-                "created_at": datetime.now(timezone.utc)
-            })
-            liked = True
+            result = toggle_user_follow(current_user.id, artist_id)
         
-        likes_count = likes_collection.count_documents({"artwork_id": artwork_obj_id})
-        return jsonify({'success': True, 'liked': liked, 'likes_count': likes_count})
+        if result['changed']:
+            if result['following']:
+                tasks.backfill_timeline_job.delay(user_id=current_user.id, artist_id=user_id)
+            else:
+                tasks.unfollow_timeline.delay(user_id=current_user.id, artist_id=user_id)
+            bump_content_version()
+        return jsonify({'success': True, 'following': result['following'], 'followers_count': result['followers_count']})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 400
 
-@app.route('/api/artwork/<artwork_id>/comment', methods=['POST'])
+@bp.route('/api/artwork/<artwork_id>/comment', methods=['POST'])
 @login_required
 def add_comment_route(artwork_id):
     """Add comment to artwork"""
@@ -351,12 +654,15 @@ def add_comment_route(artwork_id):
             "created_at": datetime.now(timezone.utc),
             "updated_at": None
         }
-        result = comments_collection.insert_one(comment_data)
+        result = get_collection("comments").insert_one(comment_data)
+        # inline, not a job: jobs can run twice and $inc isn't idempotent
+        increment_comments(comment_data["artwork_id"])
+        bump_content_version()
         return jsonify({'success': True, 'comment_id': str(result.inserted_id)})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 400
 
-@app.route('/api/comment/<comment_id>/edit', methods=['PUT'])
+@bp.route('/api/comment/<comment_id>/edit', methods=['PUT'])
 @login_required
 def edit_comment(comment_id):
     """Edit comment"""
@@ -366,42 +672,113 @@ def edit_comment(comment_id):
         if not new_text:
             return jsonify({'success': False, 'error': 'Comment text required'}), 400
         
-        result = comments_collection.update_one(
+        result = get_collection("comments").update_one(
             {"_id": ObjectId(comment_id), "user_id": ObjectId(current_user.id)},
             {"$set": {"text": new_text, "updated_at": datetime.now(timezone.utc)}}
         )
         
         if result.modified_count > 0:
+            # artwork pages answer with a 304 until the content version moves
+            bump_content_version()
             return jsonify({'success': True})
         else:
             return jsonify({'success': False, 'error': 'Unauthorized or comment not found'}), 403
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 400
 
-@app.route('/api/comment/<comment_id>/delete', methods=['DELETE'])
+@bp.route('/api/comment/<comment_id>/delete', methods=['DELETE'])
 @login_required
 def delete_comment_route(comment_id):
     """Delete comment"""
     try:
-        result = comments_collection.delete_one({
-            "_id": ObjectId(comment_id),
-            "user_id": ObjectId(current_user.id)
-        })
+        deleted = get_collection("comments").find_one_and_delete(
+            {"_id": ObjectId(comment_id), "user_id": ObjectId(current_user.id)},
+            projection={"artwork_id": 1}
+        )
         
-        if result.deleted_count > 0:
+        if deleted:
+            increment_comments(deleted['artwork_id'], -1)
+            bump_content_version()
             return jsonify({'success': True})
         else:
             return jsonify({'success': False, 'error': 'Unauthorized or comment not found'}), 403
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 400
 
-@app.errorhandler(404)
+@bp.route('/api/cache/stats')
+def cache_stats():
+    """Hit/miss statistics for this process's caches"""
+    return jsonify({
+        'success': True,
+        'user_cache': user_cache.stats(),
+        'render_cache': render_cache_backend.stats()
+    })
+
+@bp.app_errorhandler(404)
 def not_found(e):
     return render_template('404.html'), 404
 
-@app.errorhandler(500)
+@bp.app_errorhandler(500)
 def internal_error(e):
     return render_template('500.html'), 500
 
+# -- app factory
+def default_config():
+    """Settings from the environment; create_app(config) overrides any of them."""
+    return {
+        'SECRET_KEY': os.getenv('SECRET_KEY', 'dev'),
+        'MONGO_URI': db.MONGO_URI,
+        'DB_NAME': db.DB_NAME,
+        'READ_PREFERENCE': db.READ_PREFERENCE,
+        'FEED_PAGE_SIZE': int(os.getenv('FEED_PAGE_SIZE', 24)),
+        'COMMENTS_PAGE_SIZE': int(os.getenv('COMMENTS_PAGE_SIZE', 20)),
+        'ENSURE_INDEXES': os.getenv('ENSURE_INDEXES', 'true').lower() == 'true',
+        'CHECK_QUERY_PLANS': os.getenv('CHECK_QUERY_PLANS', 'false').lower() == 'true',
+        'BUILD_RANKINGS': os.getenv('BUILD_RANKINGS', 'true').lower() == 'true',
+        'ASYNC_READS': os.getenv('ASYNC_READS', 'false').lower() == 'true',
+        'READ_YOUR_WRITES_SECONDS': int(os.getenv('READ_YOUR_WRITES_SECONDS', MAX_STALENESS_SECONDS)),
+    }
+
+def create_app(config=None):
+    """Build the Flask app. `config` is a dict overriding default_config().
+
+    Nothing connects to MongoDB until the first query (ENSURE_INDEXES is
+    the first one at startup), and each process gets its own client, so the
+    app can be created once and forked into workers (see gunicorn.conf.py).
+    """
+    started = time.perf_counter()
+    timings = {'imports': _import_seconds}
+
+    app = Flask(__name__)
+    app.config.update(default_config())
+    app.config.update(config or {})
+
+    db.init_app(app)
+    login_manager.init_app(app)
+    app.register_blueprint(bp)
+    register_commands(app)
+    instrumentation.init_app(app)
+    media.init_app(app)
+    static_assets.init_app(app)
+    live.init_app(app)
+    timings['setup'] = time.perf_counter() - started
+
+    if app.config['ENSURE_INDEXES']:
+        phase = time.perf_counter()
+        ensure_indexes()
+        timings['indexes'] = time.perf_counter() - phase
+    if app.config['BUILD_RANKINGS']:
+        phase = time.perf_counter()
+        build_missing_rankings()
+        timings['rankings'] = time.perf_counter() - phase
+    if app.config['CHECK_QUERY_PLANS']:
+        phase = time.perf_counter()
+        check_query_plans()
+        timings['query_plans'] = time.perf_counter() - phase
+
+    timings['total'] = _import_seconds + time.perf_counter() - started
+    instrumentation.record_startup(timings)
+    return app
+
 if __name__ == '__main__':
-    app.run(debug=True)
+    create_app().run(debug=True)
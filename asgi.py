@@ -0,0 +1,8 @@
+# asgi.py
+# ASGI entry point, e.g. `uvicorn asgi:asgi_app --workers 4`. Combine with
+# ASYNC_READS=true so read-heavy pages issue their queries concurrently.
+from asgiref.wsgi import WsgiToAsgi
+
+from app import create_app
+
+asgi_app = WsgiToAsgi(create_app())
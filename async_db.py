@@ -0,0 +1,67 @@
+import asyncio
+import os
+import threading
+from dotenv import load_dotenv
+
+try:
+    from motor.motor_asyncio import AsyncIOMotorClient
+except ImportError:  # only needed when ASYNC_READS is enabled
+    AsyncIOMotorClient = None
+
+from pymongo.read_preferences import Primary
+
+from db import client_options, get_settings, page_read_preference, primary_reads_in_effect
+from instrumentation import query_listener, pool_listener
+
+load_dotenv()
+ASYNC_TIMEOUT = float(os.getenv("ASYNC_TIMEOUT", 10))
+
+# One event loop per process runs in a background thread and owns the Motor
+# client, so sync Flask views can hand it a batch of independent queries and
+# wait for all of them at once instead of issuing them one after another.
+_loop = None
+_client = None
+_lock = threading.Lock()
+
+def get_loop():
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="motor-loop", daemon=True).start()
+    return _loop
+
+def get_async_client():
+    """Return the Motor client, built with the same options and listeners as db.py's.
+
+    Must be called from a coroutine running on get_loop(). The request's
+    context is carried over by run_async(), so queries are counted against
+    the request that issued them.
+    """
+    global _client
+    if AsyncIOMotorClient is None:
+        raise RuntimeError("ASYNC_READS requires the 'motor' package")
+    if _client is None:
+        _client = AsyncIOMotorClient(get_settings()["uri"], event_listeners=[query_listener, pool_listener],
+                                     **client_options())
+    return _client
+
+def read_collection(name):
+    """Motor counterpart of db.read_collection(), routed the same way."""
+    read_preference = Primary() if primary_reads_in_effect() else page_read_preference()
+    database = get_async_client().get_database(get_settings()["name"], read_preference=read_preference)
+    return database.get_collection(name)
+
+def reset_after_fork():
+    """The loop thread doesn't survive fork(); a forked child starts its own on first use."""
+    global _loop, _client, _lock
+    _loop = None
+    _client = None
+    _lock = threading.Lock()
+
+os.register_at_fork(after_in_child=reset_after_fork)
+
+def run_async(coro):
+    """Run a coroutine on the shared loop and block until it finishes."""
+    future = asyncio.run_coroutine_threadsafe(coro, get_loop())
+    return future.result(ASYNC_TIMEOUT)
@@ -0,0 +1,44 @@
+# async_pages.py
+import asyncio
+
+from models.artwork_async import get_artwork_by_id, get_artwork_page, count_artworks, hydrate_artworks
+from models.comment_async import get_comment_page
+from models.like_async import has_user_liked
+from models.user_async import get_user_by_id
+
+# Page loaders used when ASYNC_READS is on. Each one issues the page's
+# independent queries concurrently; run them with async_db.run_async().
+
+async def load_feed_page(query=None, cursor=None, limit=24, viewer_id=None, with_artist=True):
+    artworks, next_cursor = await get_artwork_page(query, cursor=cursor, limit=limit)
+    await hydrate_artworks(artworks, viewer_id=viewer_id, with_artist=with_artist)
+    return artworks, next_cursor
+
+async def load_profile(user_id, cursor=None, limit=24, viewer_id=None):
+    """Return (user, artworks, next_cursor, artworks_count)."""
+    query = {"artist_id": user_id}
+    user, (artworks, next_cursor), artworks_count = await asyncio.gather(
+        get_user_by_id(user_id),
+        load_feed_page(query, cursor=cursor, limit=limit, viewer_id=viewer_id, with_artist=False),
+        count_artworks(query),
+    )
+    return user, artworks, next_cursor, artworks_count
+
+async def load_artwork_detail(artwork_id, viewer_id=None, comments_limit=20):
+    """Return (artwork, artist, comments, next_comments_cursor, user_liked).
+
+    artwork is None if not found.
+    """
+    artwork = await get_artwork_by_id(artwork_id)
+    if not artwork:
+        return None, None, [], None, False
+
+    async def not_liked():
+        return False
+
+    artist, (comments, next_cursor), user_liked = await asyncio.gather(
+        get_user_by_id(artwork["artist_id"]),
+        get_comment_page(artwork["_id"], limit=comments_limit),
+        has_user_liked(artwork["_id"], viewer_id) if viewer_id else not_liked(),
+    )
+    return artwork, artist, comments, next_cursor, user_liked
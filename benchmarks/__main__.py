@@ -0,0 +1,131 @@
+# benchmarks/__main__.py
+"""Benchmark and load-test the app.
+
+    python -m benchmarks seed --artworks 100000 --drop
+    python -m benchmarks run --requests 1000 --concurrency 16
+    python -m benchmarks run --mongomock --seed-artworks 10000
+    python -m benchmarks run --base-url http://127.0.0.1:8000
+    python -m benchmarks compare results/old.json results/new.json
+
+Point DB_NAME at a throwaway database (e.g. DB_NAME=enoughart_bench) before
+seeding; `seed --drop` deletes the existing collections.
+"""
+import argparse
+import sys
+
+def _use_mongomock():
+    # must happen before db.py imports MongoClient
+    import mongomock
+    import pymongo
+    pymongo.MongoClient = mongomock.MongoClient
+    # mongomock can't evaluate $substrCP in a find() projection; cards get
+    # the whole description here, so payload sizes read a little high
+    from models.records import Artwork
+    Artwork.PROJECTIONS["card"]["description"] = 1
+
+def _add_seed_args(parser, prefix=""):
+    parser.add_argument(f"--{prefix}users", type=int, default=1000)
+    parser.add_argument(f"--{prefix}artworks", type=int, default=10000)
+    parser.add_argument(f"--{prefix}likes-per-artwork", type=int, default=5)
+    parser.add_argument(f"--{prefix}comments-per-artwork", type=int, default=2)
+
+def seed_command(args):
+    from db import get_db
+    from indexes import ensure_indexes
+    from benchmarks.seed import seed
+
+    summary = seed(get_db(), users=args.users, artworks=args.artworks,
+                   likes_per_artwork=args.likes_per_artwork,
+                   comments_per_artwork=args.comments_per_artwork, drop=args.drop)
+    ensure_indexes()
+    print(f"Seeded {summary['users']} users, {summary['artworks']} artworks, "
+          f"{summary['likes']} likes and {summary['comments']} comments in {summary['seconds']}s")
+
+def run_command(args):
+    if args.mongomock:
+        _use_mongomock()
+    from benchmarks.driver import route_plan, run_route, TestClientSession, HttpSession
+    from benchmarks.report import summarize, write_results, print_table
+    import render_cache
+    from app import create_app
+    from db import get_db
+
+    # mongomock has no $unionWith, so rankings can't be built at startup
+    app = create_app({"BUILD_RANKINGS": False} if args.mongomock else None)
+
+    if args.mongomock:
+        from benchmarks.seed import seed
+        seed(get_db(), users=args.seed_users, artworks=args.seed_artworks,
+             likes_per_artwork=args.seed_likes_per_artwork,
+             comments_per_artwork=args.seed_comments_per_artwork)
+    if not args.page_cache:
+        # anonymous page cache would hide the database work being measured
+        render_cache.PAGE_CACHE_TTL = 0
+
+    db = get_db()
+    email = db.users.find_one({"email": {"$regex": "@bench\\.local$"}}, {"email": 1})
+    plan = route_plan(db, include_search=not args.mongomock)
+    selected = args.routes.split(",") if args.routes else list(plan)
+
+    results = {}
+    for name in selected:
+        method, url_factory, needs_login = plan[name]
+        login = email["email"] if needs_login and email else None
+        if args.base_url:
+            make_session = lambda: HttpSession(args.base_url, login)
+        else:
+            make_session = lambda: TestClientSession(app, login)
+        run_route(make_session, method, url_factory, min(args.requests, 20), args.concurrency)  # warm up
+        samples, wall = run_route(make_session, method, url_factory, args.requests, args.concurrency)
+        results[name] = summarize(samples, wall)
+        if args.mongomock:
+            # mongomock emits no command events, so the app always reports 0 queries
+            results[name]["queries_per_request"] = None
+
+    print_table(results)
+    config = {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "mode": "http" if args.base_url else "test_client",
+        "mongomock": args.mongomock,
+        "page_cache": args.page_cache,
+        "artworks": db.artworks.estimated_document_count(),
+    }
+    print("Results written to", write_results(results, config, args.output))
+
+def compare_command(args):
+    from benchmarks.report import compare
+    if compare(args.old, args.new, threshold=args.threshold):
+        sys.exit(1)
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark the app.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = sub.add_parser("seed", help="generate a dataset")
+    _add_seed_args(seed_parser)
+    seed_parser.add_argument("--drop", action="store_true", help="drop existing collections first")
+    seed_parser.set_defaults(func=seed_command)
+
+    run_parser = sub.add_parser("run", help="hit each route and report latency")
+    run_parser.add_argument("--requests", type=int, default=500)
+    run_parser.add_argument("--concurrency", type=int, default=8)
+    run_parser.add_argument("--routes", help="comma separated, default all")
+    run_parser.add_argument("--base-url", help="load-test a running server over HTTP instead of the test client")
+    run_parser.add_argument("--page-cache", action="store_true", help="leave the anonymous page cache on")
+    run_parser.add_argument("--mongomock", action="store_true", help="seed and run against in-memory mongomock")
+    run_parser.add_argument("--output", help="results file, default benchmarks/results/<time>-<commit>.json")
+    _add_seed_args(run_parser, prefix="seed-")
+    run_parser.set_defaults(func=run_command)
+
+    compare_parser = sub.add_parser("compare", help="compare two results files")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.10)
+    compare_parser.set_defaults(func=compare_command)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
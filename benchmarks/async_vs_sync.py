@@ -0,0 +1,57 @@
+# benchmarks/async_vs_sync.py
+"""Compare requests/second for the read-heavy routes with ASYNC_READS off and on.
+
+Runs against the database configured in .env, so seed it first. Usage:
+
+    python -m benchmarks.async_vs_sync --requests 500 --concurrency 16
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import render_cache
+from app import create_app
+from db import get_collection
+
+app = create_app()
+
+def _routes():
+    artwork = get_collection("artworks").find_one({}, {"artist_id": 1}, sort=[("likes_count", -1)])
+    if not artwork:
+        raise SystemExit("No artworks in the database; seed some data first.")
+    return {
+        "index": "/",
+        "profile": f"/profile/{artwork['artist_id']}",
+        "artwork_detail": f"/artwork/{artwork['_id']}",
+    }
+
+def _run(url, requests, concurrency):
+    def hit(_):
+        with app.test_client() as client:
+            client.get(url)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(hit, range(requests)))
+    return requests / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    # the page cache would hide the database work we're trying to measure
+    render_cache.PAGE_CACHE_TTL = 0
+    routes = _routes()
+    print(f"{'route':<16}{'sync req/s':>12}{'async req/s':>13}{'speedup':>9}")
+    for name, url in routes.items():
+        results = {}
+        for mode in (False, True):
+            app.config["ASYNC_READS"] = mode
+            _run(url, min(args.requests, 20), args.concurrency)  # warm up
+            results[mode] = _run(url, args.requests, args.concurrency)
+        print(f"{name:<16}{results[False]:>12.1f}{results[True]:>13.1f}{results[True] / results[False]:>8.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# benchmarks/driver.py
+"""Hit app routes through the Flask test client or over HTTP and collect samples."""
+import http.cookiejar
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.seed import BENCH_PASSWORD, WORDS
+
+SERVER_TIMING_QUERIES = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+def queries_from_server_timing(header):
+    """Read the per-request query count the app reports in its Server-Timing header."""
+    match = SERVER_TIMING_QUERIES.search(header or "")
+    return int(match.group(1)) if match else None
+
+# -- routes
+def route_plan(db, include_search=True):
+    """Return {name: (method, url_factory, needs_login)} for the benchmarked routes."""
+    artwork_ids = [str(a["_id"]) for a in db.artworks.find({}, {"_id": 1}).limit(1000)]
+    if not artwork_ids:
+        raise SystemExit("No artworks in the database; run `python -m benchmarks seed` first.")
+
+    plan = {
+        "index": ("GET", lambda rng: "/", False),
+        "artwork_detail": ("GET", lambda rng: f"/artwork/{rng.choice(artwork_ids)}", False),
+        "toggle_like": ("POST", lambda rng: f"/api/artwork/{rng.choice(artwork_ids)}/like", True),
+    }
+    if include_search:
+        plan["search"] = ("GET", lambda rng: f"/search?q={rng.choice(WORDS)}", False)
+    return plan
+
+# -- clients
+class TestClientSession:
+    def __init__(self, app, email=None):
+        self.client = app.test_client()
+        if email:
+            self.client.post("/login", data={"email": email, "password": BENCH_PASSWORD})
+
+    def request(self, method, url):
+        response = self.client.open(url, method=method)
+        return response.status_code < 400, queries_from_server_timing(response.headers.get("Server-Timing"))
+
+class HttpSession:
+    def __init__(self, base_url, email=None):
+        self.base_url = base_url.rstrip("/")
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+        if email:
+            data = urllib.parse.urlencode({"email": email, "password": BENCH_PASSWORD}).encode()
+            self.opener.open(self.base_url + "/login", data=data).read()
+
+    def request(self, method, url):
+        req = urllib.request.Request(self.base_url + url, method=method)
+        try:
+            with self.opener.open(req) as response:
+                response.read()
+                return response.status < 400, queries_from_server_timing(response.headers.get("Server-Timing"))
+        except urllib.error.HTTPError:
+            return False, None
+
+def run_route(make_session, method, url_factory, requests, concurrency, rng_seed=0):
+    """Issue `requests` calls from `concurrency` threads.
+
+    Returns (samples, wall_seconds) where samples are (latency_seconds, queries, ok).
+    """
+    sessions = threading.local()
+    samples = []
+    lock = threading.Lock()
+
+    def hit(i):
+        if not hasattr(sessions, "session"):
+            sessions.session = make_session()
+            sessions.rng = random.Random(rng_seed + threading.get_ident())
+        url = url_factory(sessions.rng)
+        started = time.perf_counter()
+        ok, queries = sessions.session.request(method, url)
+        latency = time.perf_counter() - started
+        with lock:
+            samples.append((latency, queries, ok))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(hit, range(requests)))
+    return samples, time.perf_counter() - started
@@ -0,0 +1,78 @@
+# benchmarks/report.py
+"""Summarize benchmark samples and store/compare them as JSON."""
+import json
+import os
+import subprocess
+from datetime import datetime, timezone
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def summarize(samples, wall_seconds):
+    """Turn [(latency_seconds, queries or None, ok)] into a route summary."""
+    latencies = sorted(s[0] * 1000 for s in samples)
+    queries = [s[1] for s in samples if s[1] is not None]
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for s in samples if not s[2]),
+        "p50_ms": round(percentile(latencies, 50), 2) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95), 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99), 2) if latencies else None,
+        "mean_ms": round(sum(latencies) / len(latencies), 2) if latencies else None,
+        "throughput_rps": round(len(samples) / wall_seconds, 1) if wall_seconds else None,
+        "queries_per_request": round(sum(queries) / len(queries), 2) if queries else None,
+    }
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def write_results(routes, config, path=None):
+    """Write a results file and return its path. Defaults to results/<time>-<commit>.json."""
+    commit = _git_commit()
+    now = datetime.now(timezone.utc)
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{now:%Y%m%dT%H%M%S}-{commit or 'nogit'}.json")
+    with open(path, "w") as f:
+        json.dump({"commit": commit, "timestamp": now.isoformat(), "config": config, "routes": routes}, f, indent=2)
+    return path
+
+def print_table(routes):
+    print(f"{'route':<16}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>9}{'queries':>9}{'errors':>8}")
+    for name, r in routes.items():
+        queries = "-" if r["queries_per_request"] is None else r["queries_per_request"]
+        print(f"{name:<16}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}"
+              f"{r['throughput_rps']:>9}{queries:>9}{r['errors']:>8}")
+
+def compare(old_path, new_path, threshold=0.10):
+    """Print per-route changes between two results files. Returns True if anything regressed."""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+
+    regressed = False
+    print(f"{old.get('commit')} -> {new.get('commit')}")
+    for name, after in new["routes"].items():
+        before = old["routes"].get(name)
+        if not before:
+            continue
+        for metric, higher_is_worse in (("p50_ms", True), ("p95_ms", True), ("p99_ms", True),
+                                        ("throughput_rps", False), ("queries_per_request", True)):
+            a, b = before.get(metric), after.get(metric)
+            if not a or b is None:
+                continue
+            change = (b - a) / a
+            worse = change > threshold if higher_is_worse else change < -threshold
+            regressed = regressed or worse
+            flag = "  REGRESSION" if worse else ""
+            print(f"  {name:<16}{metric:<22}{a:>10} -> {b:<10}{change:+.1%}{flag}")
+    return regressed
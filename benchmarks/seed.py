@@ -0,0 +1,112 @@
+# benchmarks/seed.py
+"""Generate a realistic dataset of users, artworks, likes and comments."""
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from werkzeug.security import generate_password_hash
+
+BENCH_PASSWORD = "benchmark"
+
+WORDS = [
+    "sunset", "portrait", "river", "city", "forest", "abstract", "study", "night", "ocean", "garden",
+    "mountain", "still", "life", "light", "shadow", "dream", "blue", "red", "golden", "winter",
+    "spring", "harbor", "figure", "window", "market", "bridge", "storm", "quiet", "morning", "memory",
+]
+MEDIUMS = [
+    "Oil Painting", "Watercolor", "Acrylic", "Digital Art", "Sculpture",
+    "Photography", "Drawing", "Mixed Media", "Print", "Other",
+]
+
+def _sentence(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+def _insert_batched(collection, docs, batch_size):
+    batch = []
+    inserted = 0
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            collection.insert_many(batch, ordered=False)
+            inserted += len(batch)
+            batch = []
+    if batch:
+        collection.insert_many(batch, ordered=False)
+        inserted += len(batch)
+    return inserted
+
+def seed(db, users=1000, artworks=10000, likes_per_artwork=5, comments_per_artwork=2,
+         batch_size=5000, drop=False, rng_seed=42):
+    """Fill `db` with generated data and return a summary with timings.
+
+    Every seeded user can log in as user<N>@bench.local with BENCH_PASSWORD.
+    Counters on artworks match the generated likes and comments.
+    """
+    rng = random.Random(rng_seed)
+    started = time.perf_counter()
+    if drop:
+        for name in ("users", "artworks", "likes", "comments"):
+            db.drop_collection(name)
+
+    now = datetime.now(timezone.utc)
+    password_hash = generate_password_hash(BENCH_PASSWORD)
+    user_docs = [{
+        "username": f"user{i}",
+        "email": f"user{i}@bench.local",
+        "password_hash": password_hash,
+        "bio": _sentence(rng, 12),
+        "profile_image": "/static/images/profile.png",
+        "banner_image": "",
+        "social_links": {},
+        "created_at": now - timedelta(days=rng.randint(0, 730)),
+    } for i in range(users)]
+    db.users.insert_many(user_docs, ordered=False)
+    user_ids = [u["_id"] for u in user_docs]
+
+    def artwork_docs():
+        for _ in range(artworks):
+            likes = rng.randint(0, likes_per_artwork * 2)
+            comments = rng.randint(0, comments_per_artwork * 2)
+            yield {
+                "artist_id": str(rng.choice(user_ids)),
+                "title": _sentence(rng, 3).title(),
+                "description": _sentence(rng, 30),
+                "image_url": f"https://picsum.photos/seed/{rng.randint(0, 10**9)}/800/600",
+                "tags": rng.sample(WORDS, 3),
+                "medium": rng.choice(MEDIUMS),
+                "year": rng.randint(1990, now.year),
+                "price": rng.choice([None, round(rng.uniform(50, 5000), 2)]),
+                "process_images": [],
+                "likes_count": min(likes, users),
+                "comments_count": comments,
+                "created_at": now - timedelta(seconds=rng.randint(0, 730 * 86400)),
+            }
+
+    artwork_count = _insert_batched(db.artworks, artwork_docs(), batch_size)
+
+    def like_and_comment_docs(kind):
+        cursor = db.artworks.find({}, {"likes_count": 1, "comments_count": 1, "created_at": 1})
+        for artwork in cursor.batch_size(batch_size):
+            if kind == "likes":
+                for user_id in rng.sample(user_ids, artwork["likes_count"]):
+                    yield {"artwork_id": artwork["_id"], "user_id": user_id, "created_at": artwork["created_at"]}
+            else:
+                for _ in range(artwork["comments_count"]):
+                    yield {
+                        "artwork_id": artwork["_id"],
+                        "user_id": rng.choice(user_ids),
+                        "text": _sentence(rng, 15),
+                        "created_at": artwork["created_at"],
+                        "updated_at": None,
+                    }
+
+    like_count = _insert_batched(db.likes, like_and_comment_docs("likes"), batch_size)
+    comment_count = _insert_batched(db.comments, like_and_comment_docs("comments"), batch_size)
+
+    return {
+        "users": users,
+        "artworks": artwork_count,
+        "likes": like_count,
+        "comments": comment_count,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
@@ -0,0 +1,258 @@
+# bulk.py
+"""Stream users, artworks, likes and comments in and out of Mongo as NDJSON or CSV."""
+import csv
+import json
+import time
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from pymongo import InsertOne, ReplaceOne
+from pymongo.errors import BulkWriteError
+from werkzeug.security import generate_password_hash
+
+from db import get_db
+
+# CSV columns per collection; NDJSON carries every field
+CSV_FIELDS = {
+    "users": ["_id", "username", "email", "password_hash", "bio", "profile_image", "banner_image", "created_at"],
+    "artworks": ["_id", "artist_id", "title", "description", "image_url", "tags", "medium", "year", "price",
+                 "process_images", "likes_count", "comments_count", "created_at", "updated_at"],
+    "likes": ["_id", "artwork_id", "user_id", "created_at"],
+    "comments": ["_id", "artwork_id", "user_id", "text", "created_at", "updated_at"],
+}
+
+# -- field parsing
+def _object_id(value, field):
+    if isinstance(value, ObjectId):
+        return value
+    try:
+        return ObjectId(value)
+    except Exception:
+        raise ValueError(f"{field} is not a valid ObjectId: {value!r}")
+
+def _datetime(value, field, default=None):
+    if value in (None, ""):
+        return default
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            raise ValueError(f"{field} is not an ISO 8601 date: {value!r}")
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def _number(value, field, cast, default=None):
+    if value in (None, ""):
+        return default
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} is not a number: {value!r}")
+
+def _list(value):
+    if value in (None, ""):
+        return []
+    if isinstance(value, list):
+        return value
+    return [item.strip() for item in str(value).split(",") if item.strip()]
+
+def _required(record, *fields):
+    for field in fields:
+        if record.get(field) in (None, ""):
+            raise ValueError(f"missing {field}")
+
+def _with_id(record, doc):
+    if record.get("_id") not in (None, ""):
+        doc["_id"] = _object_id(record["_id"], "_id")
+    return doc
+
+# -- validation
+def validate_user(record, now):
+    _required(record, "username", "email")
+    password_hash = record.get("password_hash")
+    if not password_hash:
+        if not record.get("password"):
+            raise ValueError("missing password_hash or password")
+        password_hash = generate_password_hash(record["password"])
+    return _with_id(record, {
+        "username": record["username"],
+        "email": record["email"].strip(),
+        "password_hash": password_hash,
+        "bio": record.get("bio") or "",
+        "profile_image": record.get("profile_image") or "/static/images/profile.png",
+        "banner_image": record.get("banner_image") or "",
+        "social_links": record.get("social_links") or {},
+        "created_at": _datetime(record.get("created_at"), "created_at", now),
+    })
+
+def validate_artwork(record, now):
+    _required(record, "artist_id", "title", "image_url")
+    doc = {
+        # artist_id is stored as a string, matching add_artwork_route
+        "artist_id": str(_object_id(record["artist_id"], "artist_id")),
+        "title": record["title"],
+        "description": record.get("description") or "",
+        "image_url": record["image_url"],
+        "tags": _list(record.get("tags")),
+        "medium": record.get("medium") or None,
+        "year": _number(record.get("year"), "year", int),
+        "price": _number(record.get("price"), "price", float),
+        "process_images": _list(record.get("process_images")),
+        "likes_count": _number(record.get("likes_count"), "likes_count", int, 0),
+        "comments_count": _number(record.get("comments_count"), "comments_count", int, 0),
+        "created_at": _datetime(record.get("created_at"), "created_at", now),
+    }
+    updated_at = _datetime(record.get("updated_at"), "updated_at")
+    if updated_at:
+        doc["updated_at"] = updated_at
+    return _with_id(record, doc)
+
+def validate_like(record, now):
+    _required(record, "artwork_id", "user_id")
+    return _with_id(record, {
+        "artwork_id": _object_id(record["artwork_id"], "artwork_id"),
+        "user_id": _object_id(record["user_id"], "user_id"),
+        "created_at": _datetime(record.get("created_at"), "created_at", now),
+    })
+
+def validate_comment(record, now):
+    _required(record, "artwork_id", "user_id", "text")
+    return _with_id(record, {
+        "artwork_id": _object_id(record["artwork_id"], "artwork_id"),
+        "user_id": _object_id(record["user_id"], "user_id"),
+        "text": record["text"],
+        "created_at": _datetime(record.get("created_at"), "created_at", now),
+        "updated_at": _datetime(record.get("updated_at"), "updated_at"),
+    })
+
+VALIDATORS = {
+    "users": validate_user,
+    "artworks": validate_artwork,
+    "likes": validate_like,
+    "comments": validate_comment,
+}
+
+# -- reading and writing records
+def read_records(stream, fmt):
+    """Yield one dict per record from an NDJSON or CSV text stream."""
+    if fmt == "csv":
+        for row in csv.DictReader(stream):
+            yield row
+        return
+    for line in stream:
+        line = line.strip()
+        if line:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                yield line  # reported as invalid by import_records
+
+def _json_default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return ",".join(str(item) for item in value)
+    if isinstance(value, (ObjectId, datetime)):
+        return _json_default(value)
+    return value
+
+# -- import
+class ImportStats:
+    def __init__(self):
+        self.read = 0
+        self.written = 0
+        self.invalid = 0
+        self.rejected = 0  # refused by the database, e.g. duplicate keys
+        self.errors = []   # first few (record number, message) for the report
+        self.started = time.perf_counter()
+
+    @property
+    def seconds(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def rate(self):
+        return self.read / self.seconds if self.seconds else 0.0
+
+    def error(self, number, message, keep=20):
+        if len(self.errors) < keep:
+            self.errors.append((number, message))
+
+def _flush(collection, batch, upsert, stats):
+    # records without an _id can't be matched, so they are inserted even with upsert
+    requests = [
+        ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) if upsert and "_id" in doc else InsertOne(doc)
+        for doc in batch
+    ]
+    try:
+        result = collection.bulk_write(requests, ordered=False)
+        stats.written += result.inserted_count + result.upserted_count + result.matched_count
+    except BulkWriteError as e:
+        details = e.details
+        stats.written += details.get("nInserted", 0) + details.get("nUpserted", 0) + details.get("nMatched", 0)
+        stats.rejected += len(details.get("writeErrors", []))
+        for error in details.get("writeErrors", [])[:3]:
+            stats.error(None, error.get("errmsg", "write error"))
+
+def import_records(collection_name, records, batch_size=1000, upsert=False, progress=None):
+    """Validate records and write them in unordered batches.
+
+    Invalid records are counted and skipped rather than aborting the load.
+    With upsert, records carrying an _id replace the existing document, so
+    an import can be re-run after a partial failure. `progress(stats)` is
+    called after every batch.
+    """
+    validate = VALIDATORS[collection_name]
+    collection = get_db()[collection_name]
+    stats = ImportStats()
+    now = datetime.now(timezone.utc)
+    batch = []
+    for record in records:
+        stats.read += 1
+        try:
+            if not isinstance(record, dict):
+                raise ValueError(f"not a JSON object: {str(record)[:80]!r}")
+            batch.append(validate(record, now))
+        except (ValueError, KeyError, AttributeError) as e:
+            stats.invalid += 1
+            stats.error(stats.read, str(e))
+            continue
+        if len(batch) >= batch_size:
+            _flush(collection, batch, upsert, stats)
+            batch = []
+            if progress:
+                progress(stats)
+    if batch:
+        _flush(collection, batch, upsert, stats)
+        if progress:
+            progress(stats)
+    return stats
+
+# -- export
+def export_records(collection_name, stream, fmt, batch_size=1000, query=None):
+    """Write a collection to a text stream, reading it through a cursor so memory stays flat."""
+    cursor = get_db()[collection_name].find(query or {}).sort("_id", 1).batch_size(batch_size)
+    count = 0
+    if fmt == "csv":
+        fields = CSV_FIELDS[collection_name]
+        writer = csv.DictWriter(stream, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        for doc in cursor:
+            writer.writerow({field: _csv_value(doc.get(field)) for field in fields})
+            count += 1
+    else:
+        for doc in cursor:
+            stream.write(json.dumps(doc, default=_json_default, ensure_ascii=False))
+            stream.write("\n")
+            count += 1
+    return count
@@ -0,0 +1,139 @@
+# cache.py
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:  # optional, only needed for CACHE_URL=redis://...
+    redis = None
+
+class TTLCache:
+    """Bounded, thread-safe LRU cache whose entries also expire after `ttl` seconds.
+
+    The cache is per process, so other workers only see an invalidation once
+    their own copy expires; keep `ttl` short for data that can change.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + (ttl or self.ttl))
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+# -- shared cache backends
+class LocalBackend:
+    """In-process backend: a TTLCache for values plus plain counters for versions."""
+
+    shared = False
+
+    def __init__(self, maxsize=4096, ttl=300):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def get_many(self, keys):
+        return [self._cache.get(key) for key in keys]
+
+    def set(self, key, value, ttl=None):
+        self._cache.set(key, value, ttl)
+
+    def delete(self, key):
+        self._cache.delete(key)
+
+    def get_counter(self, key):
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def stats(self):
+        return self._cache.stats()
+
+class RedisBackend:
+    """Backend for Redis or any server speaking its protocol, shared by every worker."""
+
+    shared = True
+
+    def __init__(self, url):
+        if redis is None:
+            raise RuntimeError("CACHE_URL points at Redis but the 'redis' package is not installed")
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+
+    def get(self, key):
+        return self._redis.get(key)
+
+    def get_many(self, keys):
+        return self._redis.mget(keys) if keys else []
+
+    def set(self, key, value, ttl=None):
+        self._redis.set(key, value, ex=int(ttl) if ttl else None)
+
+    def delete(self, key):
+        self._redis.delete(key)
+
+    def get_counter(self, key):
+        return int(self._redis.get(key) or 0)
+
+    def incr(self, key):
+        return self._redis.incr(key)
+
+    def stats(self):
+        info = self._redis.info("stats")
+        return {"hits": info.get("keyspace_hits"), "misses": info.get("keyspace_misses")}
+
+def make_backend(url=None):
+    """Pick a backend from a CACHE_URL style setting; empty means in-process."""
+    if url and url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    return LocalBackend()
@@ -0,0 +1,184 @@
+# commands.py
+import time
+
+import click
+
+import bulk
+from db import get_client, get_collection, client_options, read_collection
+from indexes import ensure_indexes, check_query_plans
+from jobs import MongoQueue, JOB_WORKERS
+from models.cleanup import DEPENDENTS, GC_BATCH_SIZE, GC_THROTTLE_SECONDS, cascade_user, collect_orphans
+from models.counters import reconcile_counters
+from models.facets import rebuild_facets
+from models.like import remove_duplicate_likes
+from models.ranking import RANKINGS, build_missing_rankings, refresh_ranking
+from models.user import get_user_by_id, invalidate_user
+from render_cache import bump_content_version, backend as render_cache_backend
+
+def register_commands(app):
+    """Attach the maintenance CLI commands to the Flask app"""
+
+    @app.cli.command('ensure-indexes')
+    def ensure_indexes_command():
+        """Create every MongoDB index the app relies on."""
+        failures = ensure_indexes()
+        for collection_name, index_name, error in failures:
+            click.echo(f"FAILED {collection_name}.{index_name}: {error}", err=True)
+        if failures:
+            raise SystemExit(1)
+        click.echo("Indexes are up to date.")
+        built, failures = build_missing_rankings()
+        for name in built:
+            click.echo(f"Built the {name} ranking.")
+        for name, error in failures:
+            click.echo(f"FAILED {name} ranking: {error}", err=True)
+
+    @app.cli.command('check-indexes')
+    def check_indexes_command():
+        """Report queries that would still do a collection scan."""
+        collscans = check_query_plans()
+        for description in collscans:
+            click.echo(f"COLLSCAN: {description}")
+        if not collscans:
+            click.echo("Every known query shape is served by an index.")
+
+    @app.cli.command('reconcile-counters')
+    @click.option('--dry-run', is_flag=True, help="Only report drift, don't fix it.")
+    def reconcile_counters_command(dry_run):
+        """Recompute likes_count/comments_count on every artwork."""
+        drifted = reconcile_counters(dry_run=dry_run)
+        verb = "would be fixed" if dry_run else "fixed"
+        click.echo(f"{drifted} artwork(s) with drifted counters {verb}.")
+
+    @app.cli.command('rebuild-facets')
+    @click.option('--dry-run', is_flag=True, help="Only report drift, don't fix it.")
+    def rebuild_facets_command(dry_run):
+        """Recount the tag, medium and year facet values from the artworks."""
+        drifted = rebuild_facets(dry_run=dry_run)
+        verb = "would be fixed" if dry_run else "fixed"
+        click.echo(f"{drifted} facet value(s) with drifted counts {verb}.")
+        if drifted and not dry_run:
+            bump_content_version()
+
+    @app.cli.command('dedupe-likes')
+    def dedupe_likes_command():
+        """Remove duplicate likes so the unique likes index can be built."""
+        removed = remove_duplicate_likes()
+        click.echo(f"Removed {sum(removed.values())} duplicate like(s) on {len(removed)} artwork(s).")
+        if removed:
+            click.echo("Run reconcile-counters to correct likes_count on those artworks.")
+
+    @app.cli.command('gc-orphans')
+    @click.argument('collection', type=click.Choice(list(DEPENDENTS) + ['all']), default='all')
+    @click.option('--dry-run', is_flag=True, help="Only count orphans, don't delete them.")
+    @click.option('--batch-size', default=GC_BATCH_SIZE, show_default=True)
+    @click.option('--throttle', default=GC_THROTTLE_SECONDS, show_default=True, help="Seconds to pause between batches.")
+    @click.option('--max-batches', type=int, help="Stop after this many batches; the next run resumes.")
+    @click.option('--restart', is_flag=True, help="Ignore the saved position and scan from the beginning.")
+    def gc_orphans_command(collection, dry_run, batch_size, throttle, max_batches, restart):
+        """Delete likes/comments whose artwork or user no longer exists."""
+        def progress(stats):
+            click.echo(f"  {stats.scanned} scanned, {stats.orphans} orphans, {stats.rate:,.0f} docs/s", err=True)
+
+        for name in (DEPENDENTS if collection == 'all' else [collection]):
+            stats = collect_orphans(name, dry_run=dry_run, batch_size=batch_size, throttle=throttle,
+                                    restart=restart, max_batches=max_batches, progress=progress)
+            where = f" (resumed after {stats.resumed_from})" if stats.resumed_from else ""
+            verb = "found" if dry_run else f"found, {stats.removed} deleted"
+            state = "done" if stats.finished else "stopped early; run again to resume"
+            click.echo(f"{name}: {stats.scanned} scanned{where}, {stats.orphans} orphans {verb} "
+                       f"in {stats.seconds:.1f}s; {state}.")
+
+    @app.cli.command('delete-user')
+    @click.argument('user_id')
+    @click.option('--yes', is_flag=True, help="Don't ask for confirmation.")
+    def delete_user_command(user_id, yes):
+        """Delete a user with their artworks, likes and comments."""
+        user = get_user_by_id(user_id)
+        if not user:
+            raise click.ClickException(f"No user {user_id}")
+        if not yes:
+            click.confirm(f"Delete {user['username']} <{user['email']}> and everything they posted?", abort=True)
+        get_collection("users").delete_one({"_id": user["_id"]})
+        invalidate_user(user_id)
+        removed = cascade_user(user["_id"])
+        bump_content_version()
+        click.echo(f"Deleted {user['username']}: {removed.get('artworks', 0)} artwork(s), "
+                   f"{removed.get('likes', 0)} like(s), {removed.get('comments', 0)} comment(s).")
+
+    @app.cli.command('run-worker')
+    @click.option('--workers', default=JOB_WORKERS, show_default=True, help="Worker threads.")
+    @click.option('--burst', is_flag=True, help="Exit once no jobs are due.")
+    def run_worker_command(workers, burst):
+        """Process jobs from the durable queue (JOB_BACKEND=mongo)."""
+        if not render_cache_backend.shared:
+            click.echo("Warning: CACHE_URL is not set, so page invalidations from jobs "
+                       "won't reach the web workers.", err=True)
+        click.echo(f"Processing jobs with {workers} worker thread(s). Press Ctrl+C to stop.")
+        MongoQueue().work(workers=workers, burst=burst)
+
+    @app.cli.command('refresh-rankings')
+    @click.argument('names', nargs=-1, type=click.Choice(RANKINGS))
+    def refresh_rankings_command(names):
+        """Rebuild the trending and most liked rankings (e.g. from cron)."""
+        for name in names or RANKINGS:
+            refresh_ranking(name)
+            click.echo(f"Refreshed {name}.")
+
+    def _format(path, fmt):
+        if fmt:
+            return fmt
+        return "csv" if path.endswith(".csv") else "ndjson"
+
+    @app.cli.command('import-data')
+    @click.argument('collection', type=click.Choice(list(bulk.VALIDATORS)))
+    @click.argument('source', type=click.File('r', encoding='utf-8'))
+    @click.option('--format', 'fmt', type=click.Choice(['ndjson', 'csv']), help="Default: from the file extension.")
+    @click.option('--batch-size', default=1000, show_default=True)
+    @click.option('--upsert', is_flag=True, help="Replace existing documents that have the same _id.")
+    def import_data_command(collection, source, fmt, batch_size, upsert):
+        """Bulk load NDJSON or CSV records (use - for stdin)."""
+        def progress(stats):
+            click.echo(f"  {stats.read} read, {stats.written} written, {stats.rate:,.0f} records/s", err=True)
+
+        stats = bulk.import_records(collection, bulk.read_records(source, _format(source.name, fmt)),
+                                    batch_size=batch_size, upsert=upsert, progress=progress)
+        click.echo(f"{stats.written} of {stats.read} {collection} written in {stats.seconds:.1f}s "
+                   f"({stats.rate:,.0f} records/s); {stats.invalid} invalid, {stats.rejected} rejected.")
+        for number, message in stats.errors:
+            click.echo(f"  record {number}: {message}" if number else f"  {message}", err=True)
+        if stats.written:
+            bump_content_version()
+        if collection in ("likes", "comments") and stats.written:
+            click.echo("Run reconcile-counters to update likes_count/comments_count on the artworks.")
+        if collection == "artworks" and stats.written:
+            click.echo("Run rebuild-facets to update the tag, medium and year counts.")
+
+    @app.cli.command('export-data')
+    @click.argument('collection', type=click.Choice(list(bulk.VALIDATORS)))
+    @click.argument('target', type=click.File('w', encoding='utf-8'))
+    @click.option('--format', 'fmt', type=click.Choice(['ndjson', 'csv']), help="Default: from the file extension.")
+    @click.option('--batch-size', default=1000, show_default=True)
+    def export_data_command(collection, target, fmt, batch_size):
+        """Stream a collection to NDJSON or CSV (use - for stdout)."""
+        started = time.perf_counter()
+        count = bulk.export_records(collection, target, _format(target.name, fmt), batch_size=batch_size)
+        seconds = time.perf_counter() - started
+        click.echo(f"Exported {count} {collection} in {seconds:.1f}s ({count / seconds if seconds else 0:,.0f} records/s).",
+                   err=True)
+
+    @app.cli.command('db-status')
+    def db_status_command():
+        """Show replica set members, pool settings and where page reads are routed."""
+        client = get_client()
+        client.admin.command("ping")
+        topology = client.topology_description
+        click.echo(f"Topology: {topology.topology_type_name}")
+        for server in topology.server_descriptions().values():
+            click.echo(f"  {server.address[0]}:{server.address[1]} {server.server_type_name}")
+        click.echo(f"Client options: {client_options()}")
+        artworks = read_collection("artworks")
+        click.echo(f"Page reads use: {artworks.read_preference}")
+        cursor = artworks.find({}, {"_id": 1}).limit(1)
+        list(cursor)
+        click.echo(f"A page read was served by: {cursor.address}")
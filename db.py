@@ -1,21 +1,145 @@
+import atexit
+import threading
+from contextvars import ContextVar
+
 from pymongo import MongoClient
+from pymongo.read_preferences import Primary, SecondaryPreferred
 import os
 from dotenv import load_dotenv
 
+from instrumentation import query_listener, pool_listener
+
 load_dotenv()
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://127.0.0.1:27017")
 DB_NAME = os.getenv("DB_NAME", "enoughart")
 
-_client = MongoClient(MONGO_URI)
-_db = _client[DB_NAME]
+# "primary" or "secondaryPreferred"; applies to the read-only page queries
+# that go through read_collection(). Writes always use the primary.
+READ_PREFERENCE = os.getenv("READ_PREFERENCE", "primary")
+# MongoDB requires at least 90 seconds
+MAX_STALENESS_SECONDS = int(os.getenv("MAX_STALENESS_SECONDS", 90))
+
+def _int_env(name):
+    value = os.getenv(name)
+    return int(value) if value else None
+
+def client_options():
+    """MongoClient pool, timeout and compression settings from the environment.
+
+    Unset values fall back to the driver defaults (or to whatever MONGO_URI
+    specifies).
+    """
+    options = {
+        "maxPoolSize": _int_env("MONGO_MAX_POOL_SIZE"),
+        "minPoolSize": _int_env("MONGO_MIN_POOL_SIZE"),
+        "maxIdleTimeMS": _int_env("MONGO_MAX_IDLE_TIME_MS"),
+        "waitQueueTimeoutMS": _int_env("MONGO_WAIT_QUEUE_TIMEOUT_MS"),
+        "connectTimeoutMS": _int_env("MONGO_CONNECT_TIMEOUT_MS"),
+        "socketTimeoutMS": _int_env("MONGO_SOCKET_TIMEOUT_MS"),
+        "serverSelectionTimeoutMS": _int_env("MONGO_SERVER_SELECTION_TIMEOUT_MS"),
+        "compressors": os.getenv("MONGO_COMPRESSORS") or None,  # e.g. "zstd,snappy,zlib"
+        "appname": os.getenv("MONGO_APPNAME", "enoughart"),
+    }
+    return {key: value for key, value in options.items() if value is not None}
+
+# -- handle
+# The client is created on first use in each process, never at import time:
+# a MongoClient must not be shared across fork(), and CLI commands or tools
+# that only import the models shouldn't open connections they don't need.
+# create_app() configures it through init_app(); the environment is the default.
+_settings = {"uri": MONGO_URI, "name": DB_NAME, "read_preference": READ_PREFERENCE}
+_handle = {"pid": None, "client": None, "db": None, "read_db": None}
+_lock = threading.Lock()
+
+def _connect():
+    client = MongoClient(_settings["uri"], connect=False,
+                         event_listeners=[query_listener, pool_listener], **client_options())
+    _handle.update(
+        client=client,
+        db=client[_settings["name"]],
+        read_db=client.get_database(_settings["name"], read_preference=page_read_preference()),
+    )
+    # set last: other threads treat a matching pid as "handle ready"
+    _handle["pid"] = os.getpid()
+
+def _get(key):
+    if _handle["pid"] != os.getpid():
+        with _lock:
+            if _handle["pid"] != os.getpid():
+                _connect()
+    return _handle[key]
+
+def init_app(app):
+    """Use the app's MONGO_URI, DB_NAME and READ_PREFERENCE."""
+    settings = {
+        "uri": app.config.get("MONGO_URI", MONGO_URI),
+        "name": app.config.get("DB_NAME", DB_NAME),
+        "read_preference": app.config.get("READ_PREFERENCE", READ_PREFERENCE),
+    }
+    if settings != _settings:
+        # a client made for other settings is replaced on next use
+        close()
+        _settings.update(settings)
+
+def reinit_after_fork():
+    """Forget the parent's client in a forked child; the child connects on first use.
+
+    The parent's sockets are left alone rather than closed, since the
+    parent may still be using them.
+    """
+    global _lock
+    _lock = threading.Lock()
+    _handle.update(pid=None, client=None, db=None, read_db=None)
+
+def close():
+    """Close this process's client, if it has one. The next use reconnects."""
+    with _lock:
+        client = _handle["client"] if _handle["pid"] == os.getpid() else None
+        _handle.update(pid=None, client=None, db=None, read_db=None)
+    if client is not None:
+        client.close()
+
+os.register_at_fork(after_in_child=reinit_after_fork)
+atexit.register(close)
+
+def get_collection(name):
+    """Collection handle for writes and for reads that must see the primary."""
+    return _get("db").get_collection(name)
+
+# set for requests that must see their own recent writes
+_primary_reads = ContextVar("primary_reads", default=False)
+
+def read_collection(name):
+    """Collection handle for read-only page queries.
+
+    Uses READ_PREFERENCE, except while use_primary_reads() is in effect.
+    """
+    if _primary_reads.get():
+        return get_collection(name)
+    return _get("read_db").get_collection(name)
+
+def page_read_preference():
+    """The read preference page reads use, from READ_PREFERENCE and MAX_STALENESS_SECONDS."""
+    if _settings["read_preference"] == "secondaryPreferred":
+        return SecondaryPreferred(max_staleness=MAX_STALENESS_SECONDS)
+    return Primary()
+
+def primary_reads_in_effect():
+    return _primary_reads.get()
+
+def use_primary_reads(enabled=True):
+    """Route read_collection() to the primary for the current context; returns a reset token."""
+    return _primary_reads.set(enabled)
+
+def reset_primary_reads(token):
+    _primary_reads.reset(token)
 
-users_collection = _db.get_collection("users")
-artworks_collection = _db.get_collection("artworks")
-comments_collection = _db.get_collection("comments")
-likes_collection = _db.get_collection("likes")
+def get_settings():
+    """The MongoDB URI, database name and read preference in use."""
+    return dict(_settings)
 
 def get_db():
-    return _db
+    return _get("db")
 
 def get_client():
-    return _client
\ No newline at end of file
+    return _get("client")
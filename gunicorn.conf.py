@@ -0,0 +1,47 @@
+# gunicorn.conf.py
+"""Recommended multi-worker setup. Run with: gunicorn "app:create_app()"
+
+The app is built once in the master (preload_app) and forked into two
+workers per core. Each worker opens its own MongoClient on first use.
+"""
+import multiprocessing
+import os
+
+import async_db
+import db
+import live
+import render_cache
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+# about two workers per core; a worker spends most of a request waiting on Mongo
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", 32))
+# Under gthread every live event stream holds one of those threads for up
+# to LIVE_STREAM_SECONDS, and every artwork page opens one. Streams are
+# capped at half the threads (or LIVE_MAX_SUBSCRIBERS if lower), so the other
+# half always serves normal requests; past the cap streams get a 503 and the
+# browser retries. For many more concurrent viewers, raise GUNICORN_THREADS.
+live_streams = max(1, threads // 2)
+# imports, app setup and index checks run once instead of once per worker
+preload_app = True
+# recycle workers now and then so slow leaks can't build up
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 10000))
+max_requests_jitter = max_requests // 10
+graceful_timeout = 30
+keepalive = 5
+
+def pre_fork(server, worker):
+    # ENSURE_INDEXES connected in the master; don't fork its sockets and monitor threads
+    db.close()
+
+def post_fork(server, worker):
+    # db, async_db and render_cache already do this through os.register_at_fork; it's
+    # repeated here so the whole worker lifecycle reads in one place
+    db.reinit_after_fork()
+    async_db.reset_after_fork()
+    render_cache.reset_instance_id()
+    live.hub.max_subscribers = min(live.LIVE_MAX_SUBSCRIBERS, live_streams)
+
+def worker_exit(server, worker):
+    db.close()
@@ -0,0 +1,173 @@
+# indexes.py
+import logging
+
+from pymongo import ASCENDING, DESCENDING, TEXT
+from pymongo.errors import OperationFailure
+from bson import ObjectId
+from datetime import datetime, timezone
+
+from db import get_db
+
+logger = logging.getLogger(__name__)
+
+# -- registry
+# collection name -> list of (keys, options). Every query shape issued from
+# app.py and models/* should be served by one of these.
+INDEXES = {
+    "users": [
+        ([("email", ASCENDING)], {"name": "email_1"}),
+        ([("followers_count", DESCENDING)], {"name": "followers_count_-1"}),
+    ],
+    "follows": [
+        ([("follower_id", ASCENDING), ("followee_id", ASCENDING)],
+         {"name": "follower_id_1_followee_id_1", "unique": True}),
+        ([("followee_id", ASCENDING), ("_id", ASCENDING)], {"name": "followee_id_1__id_1"}),
+    ],
+    "timelines": [
+        ([("user_id", ASCENDING), ("created_at", DESCENDING), ("artwork_id", DESCENDING)],
+         {"name": "user_id_1_created_at_-1_artwork_id_-1"}),
+        # one entry per (artwork, user); also serves removing a deleted artwork everywhere
+        ([("artwork_id", ASCENDING), ("user_id", ASCENDING)],
+         {"name": "artwork_id_1_user_id_1", "unique": True}),
+    ],
+    "artworks": [
+        ([("created_at", DESCENDING), ("_id", DESCENDING)], {"name": "created_at_-1__id_-1"}),
+        ([("artist_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+         {"name": "artist_id_1_created_at_-1__id_-1"}),
+        ([("title", TEXT), ("tags", TEXT), ("description", TEXT)],
+         {"name": "artwork_text", "weights": {"title": 10, "tags": 5, "description": 1}}),
+        ([("medium", ASCENDING), ("year", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+         {"name": "medium_1_year_1_created_at_-1__id_-1"}),
+        ([("year", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+         {"name": "year_1_created_at_-1__id_-1"}),
+        ([("likes_count", DESCENDING), ("_id", DESCENDING)], {"name": "likes_count_-1__id_-1"}),
+        # /browse: a tag (multikey) or a medium, newest first; other facets filter the fetched documents
+        ([("tags", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+         {"name": "tags_1_created_at_-1__id_-1"}),
+        ([("medium", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+         {"name": "medium_1_created_at_-1__id_-1"}),
+    ],
+    "likes": [
+        ([("artwork_id", ASCENDING), ("user_id", ASCENDING)],
+         {"name": "artwork_id_1_user_id_1", "unique": True}),
+        ([("user_id", ASCENDING), ("artwork_id", ASCENDING)], {"name": "user_id_1_artwork_id_1"}),
+        ([("artwork_id", ASCENDING), ("created_at", ASCENDING)], {"name": "artwork_id_1_created_at_1"}),
+        ([("created_at", ASCENDING)], {"name": "created_at_1"}),
+    ],
+    "comments": [
+        ([("artwork_id", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)],
+         {"name": "artwork_id_1_created_at_1__id_1"}),
+        ([("created_at", ASCENDING)], {"name": "created_at_1"}),
+        ([("user_id", ASCENDING)], {"name": "user_id_1"}),
+    ],
+    "facets": [
+        ([("facet", ASCENDING), ("count", DESCENDING), ("value", ASCENDING)], {"name": "facet_1_count_-1_value_1"}),
+    ],
+    "rankings": [
+        ([("ranking", ASCENDING), ("rank", ASCENDING)], {"name": "ranking_1_rank_1"}),
+    ],
+    "jobs": [
+        ([("status", ASCENDING), ("run_at", ASCENDING)], {"name": "status_1_run_at_1"}),
+        ([("status", ASCENDING), ("locked_until", ASCENDING)], {"name": "status_1_locked_until_1"}),
+    ],
+}
+
+def ensure_indexes(db=None):
+    """Create every index in INDEXES. Safe to run repeatedly.
+
+    Returns a list of (collection, index name, error) for indexes that could
+    not be built, e.g. the unique likes index when duplicates already exist.
+    """
+    db = db if db is not None else get_db()
+    failures = []
+    for collection_name, specs in INDEXES.items():
+        collection = db.get_collection(collection_name)
+        for keys, options in specs:
+            try:
+                collection.create_index(keys, **options)
+            except OperationFailure as e:
+                logger.error("Could not create index %s on %s: %s", options["name"], collection_name, e)
+                failures.append((collection_name, options["name"], str(e)))
+    return failures
+
+# -- query plan check
+# (description, collection, filter, sort) for every query shape the app issues.
+# Values are placeholders; only the shape matters to the planner.
+QUERY_SHAPES = [
+    ("users by email", "users", lambda: {"email": "someone@example.com"}, None),
+    ("home feed", "artworks", lambda: {}, [("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ("home feed next page", "artworks",
+     lambda: {"$or": [{"created_at": {"$lt": datetime.now(timezone.utc)}},
+                      {"created_at": datetime.now(timezone.utc), "_id": {"$lt": ObjectId()}}]},
+     [("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ("artist artworks", "artworks", lambda: {"artist_id": str(ObjectId())},
+     [("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ("search by medium", "artworks", lambda: {"medium": "Watercolor"},
+     [("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ("search by medium and year", "artworks", lambda: {"medium": "Watercolor", "year": 2023},
+     [("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ("search by year", "artworks", lambda: {"year": 2023},
+     [("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ("browse by tag", "artworks", lambda: {"tags": {"$all": ["landscape"]}},
+     [("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ("browse by tags and medium", "artworks",
+     lambda: {"tags": {"$all": ["landscape", "sunset"]}, "medium": "Watercolor"},
+     [("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ("facet counts", "facets", lambda: {"facet": "tag", "count": {"$gt": 0}},
+     [("count", DESCENDING), ("value", ASCENDING)]),
+    ("timeline page", "timelines",
+     lambda: {"user_id": ObjectId(), "$or": [{"created_at": {"$lt": datetime.now(timezone.utc)}},
+                                             {"created_at": datetime.now(timezone.utc), "artwork_id": {"$lt": ObjectId()}}]},
+     [("created_at", DESCENDING), ("artwork_id", DESCENDING)]),
+    ("followers for fan-out", "follows", lambda: {"followee_id": ObjectId(), "_id": {"$gt": ObjectId()}},
+     [("_id", ASCENDING)]),
+    ("followed large artists", "follows",
+     lambda: {"follower_id": ObjectId(), "followee_id": {"$in": [ObjectId(), ObjectId()]}}, None),
+    ("large artists", "users", lambda: {"followers_count": {"$gte": 10000}}, None),
+    ("like lookup", "likes", lambda: {"artwork_id": ObjectId(), "user_id": ObjectId()}, None),
+    ("viewer likes", "likes",
+     lambda: {"user_id": ObjectId(), "artwork_id": {"$in": [ObjectId(), ObjectId()]}}, None),
+    ("likes for artwork", "likes", lambda: {"artwork_id": ObjectId()}, [("created_at", ASCENDING)]),
+    ("comments for artwork", "comments", lambda: {"artwork_id": ObjectId()},
+     [("created_at", ASCENDING), ("_id", ASCENDING)]),
+    ("likes by user", "likes", lambda: {"user_id": ObjectId()}, None),
+    ("comments by user", "comments", lambda: {"user_id": ObjectId()}, None),
+    ("recent likes", "likes", lambda: {"created_at": {"$gte": datetime.now(timezone.utc)}}, None),
+    ("recent comments", "comments", lambda: {"created_at": {"$gte": datetime.now(timezone.utc)}}, None),
+    ("most liked", "artworks", lambda: {"likes_count": {"$gt": 0}},
+     [("likes_count", DESCENDING), ("_id", DESCENDING)]),
+    ("ranking page", "rankings", lambda: {"ranking": "trending", "rank": {"$gte": 0}}, [("rank", ASCENDING)]),
+    ("due jobs", "jobs", lambda: {"status": "pending", "run_at": {"$lte": datetime.now(timezone.utc)}},
+     [("run_at", ASCENDING)]),
+]
+
+def _plan_stages(plan):
+    """Yield every stage name in an explain() plan tree."""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _plan_stages(item)
+
+def find_collscans(db=None):
+    """Return the descriptions of query shapes whose winning plan is a COLLSCAN."""
+    db = db if db is not None else get_db()
+    collscans = []
+    for description, collection_name, make_filter, sort in QUERY_SHAPES:
+        cursor = db.get_collection(collection_name).find(make_filter())
+        if sort:
+            cursor = cursor.sort(sort)
+        winning_plan = cursor.explain().get("queryPlanner", {}).get("winningPlan", {})
+        if "COLLSCAN" in set(_plan_stages(winning_plan)):
+            collscans.append(description)
+    return collscans
+
+def check_query_plans(db=None):
+    """Log a warning for every query shape that would still do a COLLSCAN."""
+    collscans = find_collscans(db)
+    for description in collscans:
+        logger.warning("Query '%s' is not served by an index (COLLSCAN)", description)
+    return collscans
@@ -0,0 +1,332 @@
+# instrumentation.py
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from flask import g, request, Response
+from pymongo import monitoring
+from pymongo.common import MAX_POOL_SIZE
+
+logger = logging.getLogger(__name__)
+
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", 500))
+MAX_QUERIES_PER_REQUEST = int(os.getenv("MAX_QUERIES_PER_REQUEST", 20))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+def _collection_name(event):
+    collection = event.command.get(event.command_name)
+    if not isinstance(collection, str):
+        # getMore carries the cursor id first and the collection separately
+        collection = event.command.get("collection", event.database_name)
+    return collection
+
+# -- per-request query stats
+class RequestQueries:
+    """Mongo commands issued while handling one request.
+
+    ASYNC_READS runs a request's commands on Motor's executor threads, so
+    events for one request can arrive from several threads at once.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.breakdown = {}  # (collection, command) -> [count, ms]
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        with self._lock:
+            self._pending[event.request_id] = (_collection_name(event), event.command_name)
+            self.count += 1
+
+    def finished(self, event):
+        ms = event.duration_micros / 1000
+        with self._lock:
+            key = self._pending.pop(event.request_id, (event.database_name, event.command_name))
+            self.total_ms += ms
+            entry = self.breakdown.setdefault(key, [0, 0.0])
+            entry[0] += 1
+            entry[1] += ms
+
+    def summary(self):
+        with self._lock:
+            breakdown = sorted(self.breakdown.items(), key=lambda i: -i[1][1])
+        return ", ".join(
+            f"{collection}.{command} x{count} ({ms:.1f}ms)"
+            for (collection, command), (count, ms) in breakdown
+        )
+
+_current_queries = ContextVar("current_queries", default=None)
+
+class QueryListener(monitoring.CommandListener):
+    """Attributes every Mongo command to the request that issued it.
+
+    Events fire on the thread that ran the command and are matched to the
+    request through a context variable. run_async and Motor's executor copy
+    the context, so ASYNC_READS commands are attributed too.
+    """
+
+    def started(self, event):
+        queries = _current_queries.get()
+        if queries is not None:
+            queries.started(event)
+        metrics.record_command_started(event)
+
+    def succeeded(self, event):
+        self._finished(event)
+
+    def failed(self, event):
+        self._finished(event)
+
+    def _finished(self, event):
+        queries = _current_queries.get()
+        if queries is not None:
+            queries.finished(event)
+        metrics.record_command_finished(event)
+
+query_listener = QueryListener()
+
+# -- metrics
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+class Metrics:
+    """In-process metrics rendered in the Prometheus text format. One set per worker process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.request_latency = {}   # (route, method, status) -> Histogram
+        self.request_queries = {}   # route -> Histogram
+        self.commands = {}          # (collection, command) -> [count, seconds]
+        self._pending = {}
+        self.gauges = {}            # name -> (help, callable returning {labels: value})
+
+    def record_request(self, route, method, status, seconds, queries):
+        with self._lock:
+            key = (route, method, status)
+            if key not in self.request_latency:
+                self.request_latency[key] = Histogram(LATENCY_BUCKETS)
+            self.request_latency[key].observe(seconds)
+            if route not in self.request_queries:
+                self.request_queries[route] = Histogram(QUERY_BUCKETS)
+            self.request_queries[route].observe(queries)
+
+    def record_command_started(self, event):
+        with self._lock:
+            self._pending[event.request_id] = (_collection_name(event), event.command_name)
+
+    def record_command_finished(self, event):
+        with self._lock:
+            key = self._pending.pop(event.request_id, (event.database_name, event.command_name))
+            entry = self.commands.setdefault(key, [0, 0.0])
+            entry[0] += 1
+            entry[1] += event.duration_micros / 1_000_000
+
+    def register_gauge(self, name, help_text, collect):
+        """Expose values from `collect()` ({label string: value}) on /metrics."""
+        self.gauges[name] = (help_text, collect)
+
+    def render(self):
+        lines = [
+            "# HELP http_request_duration_seconds Request latency by route.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        with self._lock:
+            for (route, method, status), histogram in sorted(self.request_latency.items()):
+                labels = f'route="{route}",method="{method}",status="{status}"'
+                lines += histogram.render("http_request_duration_seconds", labels)
+
+            lines += [
+                "# HELP http_request_mongo_queries Mongo commands issued per request.",
+                "# TYPE http_request_mongo_queries histogram",
+            ]
+            for route, histogram in sorted(self.request_queries.items()):
+                lines += histogram.render("http_request_mongo_queries", f'route="{route}"')
+
+            lines += [
+                "# HELP mongo_commands_total Mongo commands by collection and command.",
+                "# TYPE mongo_commands_total counter",
+            ]
+            for (collection, command), (count, _) in sorted(self.commands.items()):
+                lines.append(f'mongo_commands_total{{collection="{collection}",command="{command}"}} {count}')
+            lines += [
+                "# HELP mongo_command_seconds_total Time spent in Mongo commands.",
+                "# TYPE mongo_command_seconds_total counter",
+            ]
+            for (collection, command), (_, seconds) in sorted(self.commands.items()):
+                lines.append(f'mongo_command_seconds_total{{collection="{collection}",command="{command}"}} {seconds}')
+
+        lines += pool_listener.render()
+        for name, (help_text, collect) in sorted(self.gauges.items()):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            for labels, value in collect().items():
+                lines.append(f"{name}{{{labels}}} {value}" if labels else f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+class PoolListener(monitoring.ConnectionPoolListener):
+    """Tracks connection pool usage per server for /metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pools = {}  # "host:port" -> counters
+
+    def _pool(self, address):
+        key = f"{address[0]}:{address[1]}"
+        if key not in self.pools:
+            self.pools[key] = {"open": 0, "checked_out": 0, "max_size": 0, "checkout_failures": 0,
+                               "wait": Histogram(LATENCY_BUCKETS)}
+        return self.pools[key]
+
+    def pool_created(self, event):
+        with self._lock:
+            self._pool(event.address)["max_size"] = event.options.get("maxPoolSize", MAX_POOL_SIZE)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        with self._lock:
+            self.pools.pop(f"{event.address[0]}:{event.address[1]}", None)
+
+    def connection_created(self, event):
+        with self._lock:
+            self._pool(event.address)["open"] += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            pool = self._pool(event.address)
+            pool["open"] = max(pool["open"] - 1, 0)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self._pool(event.address)["checkout_failures"] += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            pool = self._pool(event.address)
+            pool["checked_out"] += 1
+            if event.duration is not None:
+                pool["wait"].observe(event.duration)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            pool = self._pool(event.address)
+            pool["checked_out"] = max(pool["checked_out"] - 1, 0)
+
+    def gauge(self, field):
+        with self._lock:
+            return {f'server="{address}"': pool[field] for address, pool in self.pools.items()}
+
+    def render(self):
+        lines = [
+            "# HELP mongo_pool_checkout_wait_seconds Time spent waiting for a pooled connection.",
+            "# TYPE mongo_pool_checkout_wait_seconds histogram",
+        ]
+        with self._lock:
+            for address, pool in sorted(self.pools.items()):
+                lines += pool["wait"].render("mongo_pool_checkout_wait_seconds", f'server="{address}"')
+        return lines
+
+pool_listener = PoolListener()
+
+metrics = Metrics()
+metrics.register_gauge("mongo_pool_connections", "Open connections in the driver pool.",
+                       lambda: pool_listener.gauge("open"))
+metrics.register_gauge("mongo_pool_checked_out", "Connections currently in use.",
+                       lambda: pool_listener.gauge("checked_out"))
+metrics.register_gauge("mongo_pool_max_size", "maxPoolSize of the driver pool.",
+                       lambda: pool_listener.gauge("max_size"))
+metrics.register_gauge("mongo_pool_checkout_failures", "Connection checkouts that failed or timed out.",
+                       lambda: pool_listener.gauge("checkout_failures"))
+
+# -- startup
+startup_seconds = {}  # phase -> seconds, filled in by app.create_app()
+
+def record_startup(timings):
+    """Keep create_app()'s phase timings for /metrics and log them once."""
+    startup_seconds.clear()
+    startup_seconds.update(timings)
+    logger.info("Started in %.0fms (%s)", timings["total"] * 1000,
+                ", ".join(f"{phase} {seconds * 1000:.0f}ms" for phase, seconds in timings.items() if phase != "total"))
+
+metrics.register_gauge("app_startup_seconds", "Time this process took to build the app, by phase.",
+                       lambda: {f'phase="{phase}"': seconds for phase, seconds in startup_seconds.items()})
+
+# -- flask wiring
+def init_app(app):
+    """Track Mongo queries per request, add Server-Timing headers and serve /metrics."""
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+        g.request_queries = RequestQueries()
+        g.request_queries_token = _current_queries.set(g.request_queries)
+
+    @app.after_request
+    def record_request(response):
+        queries = g.get("request_queries")
+        started = g.get("request_started")
+        if queries is None or started is None:
+            return response
+
+        elapsed = time.perf_counter() - started
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        metrics.record_request(route, request.method, response.status_code, elapsed, queries.count)
+
+        response.headers.add(
+            "Server-Timing",
+            f'db;dur={queries.total_ms:.1f};desc="{queries.count} queries", app;dur={elapsed * 1000:.1f}'
+        )
+        if elapsed * 1000 > SLOW_REQUEST_MS:
+            logger.warning("Slow request %s %s took %.0fms with %d queries: %s",
+                           request.method, request.full_path, elapsed * 1000, queries.count, queries.summary())
+        elif queries.count > MAX_QUERIES_PER_REQUEST:
+            logger.warning("Possible N+1: %s %s issued %d queries: %s",
+                           request.method, request.full_path, queries.count, queries.summary())
+        return response
+
+    @app.teardown_request
+    def stop_tracking_queries(exc):
+        token = g.pop("request_queries_token", None)
+        if token is not None:
+            _current_queries.reset(token)
+
+    @app.route('/metrics')
+    def prometheus_metrics():
+        """Prometheus scrape endpoint"""
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,191 @@
+# jobs.py
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from pymongo import ReturnDocument
+
+from db import get_collection
+
+logger = logging.getLogger(__name__)
+
+# "thread" runs jobs on an in-process pool; "mongo" stores them in the jobs
+# collection so they survive restarts, and `flask run-worker` processes them.
+JOB_BACKEND = os.getenv("JOB_BACKEND", "thread")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 4))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 5))
+JOB_RETRY_DELAY = float(os.getenv("JOB_RETRY_DELAY", 2))
+JOB_MAX_RETRY_DELAY = float(os.getenv("JOB_MAX_RETRY_DELAY", 300))
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", 300))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 1))
+
+# -- registry
+_tasks = {}
+
+def task(name):
+    """Register a job handler. Call `handler.delay(**kwargs)` to enqueue it.
+
+    Keyword arguments must be BSON-serializable (pass ObjectIds as strings)
+    so the same call works with either backend.
+    """
+    def decorator(func):
+        _tasks[name] = func
+        func.delay = lambda **kwargs: enqueue(name, **kwargs)
+        return func
+    return decorator
+
+def retry_delay(attempt):
+    """Exponential backoff: JOB_RETRY_DELAY, then doubling up to JOB_MAX_RETRY_DELAY."""
+    return min(JOB_RETRY_DELAY * 2 ** (attempt - 1), JOB_MAX_RETRY_DELAY)
+
+def run_job(name, kwargs):
+    handler = _tasks.get(name)
+    if handler is None:
+        raise LookupError(f"No job handler registered for '{name}'")
+    handler(**kwargs)
+
+# -- backends
+class ThreadQueue:
+    """Runs jobs on a thread pool in this process. Queued jobs are lost on restart."""
+
+    def __init__(self, workers=JOB_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="jobs")
+        self._lock = threading.Lock()
+        self.counts = {"queued": 0, "retrying": 0, "done": 0, "failed": 0}
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self.counts[key] += amount
+
+    def enqueue(self, name, kwargs):
+        self._count("queued")
+        self._executor.submit(self._run, name, kwargs, 1)
+
+    def _run(self, name, kwargs, attempt):
+        self._count("queued", -1)
+        try:
+            run_job(name, kwargs)
+            self._count("done")
+        except Exception as e:
+            if attempt >= JOB_MAX_ATTEMPTS:
+                logger.error("Job %s failed after %d attempts: %s", name, attempt, e)
+                self._count("failed")
+                return
+            delay = retry_delay(attempt)
+            logger.warning("Job %s failed (attempt %d), retrying in %.0fs: %s", name, attempt, delay, e)
+            self._count("retrying")
+            timer = threading.Timer(delay, self._retry, (name, kwargs, attempt + 1))
+            timer.daemon = True
+            timer.start()
+
+    def _retry(self, name, kwargs, attempt):
+        self._count("retrying", -1)
+        self._count("queued")
+        self._executor.submit(self._run, name, kwargs, attempt)
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counts)
+
+class MongoQueue:
+    """Durable queue in the jobs collection.
+
+    Workers claim a job by moving it to "running" with a lease; a job whose
+    worker died is picked up again once the lease expires. Finished jobs are
+    deleted, and jobs that exhaust JOB_MAX_ATTEMPTS stay behind as "failed".
+    """
+
+    def __init__(self, collection=None):
+        self.collection = collection if collection is not None else get_collection("jobs")
+
+    def enqueue(self, name, kwargs):
+        now = datetime.now(timezone.utc)
+        self.collection.insert_one({
+            "name": name,
+            "kwargs": kwargs,
+            "status": "pending",
+            "attempts": 0,
+            "run_at": now,
+            "created_at": now,
+        })
+
+    def claim(self):
+        now = datetime.now(timezone.utc)
+        return self.collection.find_one_and_update(
+            {"$or": [
+                {"status": "pending", "run_at": {"$lte": now}},
+                {"status": "running", "locked_until": {"$lte": now}},
+            ]},
+            {"$set": {"status": "running", "locked_until": now + timedelta(seconds=JOB_LEASE_SECONDS)},
+             "$inc": {"attempts": 1}},
+            sort=[("run_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def run_one(self):
+        """Claim and run one due job. Returns False when nothing is due."""
+        job = self.claim()
+        if job is None:
+            return False
+        try:
+            run_job(job["name"], job["kwargs"])
+        except Exception as e:
+            if job["attempts"] >= JOB_MAX_ATTEMPTS:
+                logger.error("Job %s %s failed after %d attempts: %s", job["name"], job["_id"], job["attempts"], e)
+                update = {"status": "failed", "error": str(e)}
+            else:
+                delay = retry_delay(job["attempts"])
+                logger.warning("Job %s %s failed (attempt %d), retrying in %.0fs: %s",
+                               job["name"], job["_id"], job["attempts"], delay, e)
+                update = {"status": "pending", "error": str(e),
+                          "run_at": datetime.now(timezone.utc) + timedelta(seconds=delay)}
+            self.collection.update_one({"_id": job["_id"]}, {"$set": update, "$unset": {"locked_until": ""}})
+        else:
+            self.collection.delete_one({"_id": job["_id"]})
+        return True
+
+    def work(self, workers=JOB_WORKERS, stop=None, burst=False):
+        """Process jobs on `workers` threads until `stop` is set, or until the queue is empty if `burst`."""
+        stop = stop or threading.Event()
+
+        def loop():
+            while not stop.is_set():
+                if not self.run_one():
+                    if burst:
+                        return
+                    stop.wait(JOB_POLL_INTERVAL)
+
+        threads = [threading.Thread(target=loop, name=f"jobs-{i}", daemon=True) for i in range(workers)]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(0.5)
+        except KeyboardInterrupt:
+            # let running jobs finish so they aren't retried after the lease
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+    def stats(self):
+        pipeline = [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+        return {row["_id"]: row["count"] for row in self.collection.aggregate(pipeline)}
+
+_queue = None
+_queue_lock = threading.Lock()
+
+def get_queue():
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = MongoQueue() if JOB_BACKEND == "mongo" else ThreadQueue()
+    return _queue
+
+def enqueue(name, /, **kwargs):
+    """Queue a registered job and return immediately. A job may take its own `name` argument."""
+    if name not in _tasks:
+        raise LookupError(f"No job handler registered for '{name}'")
+    get_queue().enqueue(name, kwargs)
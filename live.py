@@ -0,0 +1,286 @@
+# live.py
+"""Push like/comment counts and new comments to open pages over Server-Sent Events."""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from flask import Response, jsonify, render_template, request, stream_with_context
+from pymongo.errors import OperationFailure, PyMongoError
+
+from db import get_collection, get_db
+from models.records import Comment
+from models.user import get_user_summaries
+
+logger = logging.getLogger(__name__)
+
+# "auto" watches a change stream and falls back to polling on a standalone
+# mongod; "changestream" or "poll" force one of them.
+LIVE_MODE = os.getenv("LIVE_MODE", "auto")
+LIVE_POLL_INTERVAL = float(os.getenv("LIVE_POLL_INTERVAL", 2))
+LIVE_HEARTBEAT_SECONDS = float(os.getenv("LIVE_HEARTBEAT_SECONDS", 15))
+# streams end after this long and the browser reconnects, so no worker is held forever
+LIVE_STREAM_SECONDS = float(os.getenv("LIVE_STREAM_SECONDS", 300))
+LIVE_RETRY_MS = int(os.getenv("LIVE_RETRY_MS", 5000))
+LIVE_MAX_SUBSCRIBERS = int(os.getenv("LIVE_MAX_SUBSCRIBERS", 200))
+LIVE_MAX_ARTWORKS = int(os.getenv("LIVE_MAX_ARTWORKS", 100))
+LIVE_QUEUE_SIZE = int(os.getenv("LIVE_QUEUE_SIZE", 100))
+
+COUNT_FIELDS = ("likes_count", "comments_count")
+# code returned by a standalone mongod for $changeStream
+CHANGE_STREAMS_UNSUPPORTED = 40573
+
+# -- subscriptions
+class Subscription:
+    """One open stream: the artworks it follows and a bounded queue of events."""
+
+    def __init__(self, artwork_ids, comments=False):
+        self.artwork_ids = set(artwork_ids)
+        self.comments = comments
+        self.events = queue.Queue(maxsize=LIVE_QUEUE_SIZE)
+        self.dropped = False
+
+    def put(self, event):
+        try:
+            self.events.put_nowait(event)
+        except queue.Full:
+            # a client this far behind reconnects and gets a fresh snapshot
+            self.dropped = True
+
+class LiveHub:
+    """Fans events from one shared watcher thread out to every subscription in this process."""
+
+    def __init__(self, mode=LIVE_MODE, max_subscribers=LIVE_MAX_SUBSCRIBERS):
+        self.mode = mode
+        # capped below the server's thread count by gunicorn.conf.py
+        self.max_subscribers = max_subscribers
+        self._subscriptions = {}  # artwork id -> set of Subscription
+        self._count = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self.source = None  # "changestream" or "poll" once the watcher has started
+        self.published = 0
+
+    @property
+    def subscribers(self):
+        return self._count
+
+    def subscribe(self, artwork_ids, comments=False):
+        """Register a subscription, or return None when max_subscribers are already open."""
+        subscription = Subscription(artwork_ids, comments)
+        with self._lock:
+            if self._count >= self.max_subscribers:
+                return None
+            self._count += 1
+            for artwork_id in subscription.artwork_ids:
+                self._subscriptions.setdefault(artwork_id, set()).add(subscription)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="live-watcher", daemon=True)
+                self._thread.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._count -= 1
+            for artwork_id in subscription.artwork_ids:
+                subscribers = self._subscriptions.get(artwork_id)
+                if subscribers:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscriptions[artwork_id]
+
+    def watched_ids(self):
+        with self._lock:
+            return list(self._subscriptions)
+
+    def publish(self, artwork_id, event, data):
+        with self._lock:
+            subscribers = list(self._subscriptions.get(artwork_id, ()))
+        for subscription in subscribers:
+            if event == "comment" and not subscription.comments:
+                continue
+            subscription.put((event, data))
+        self.published += 1
+
+    def _idle(self):
+        """Let the watcher exit once nobody is subscribed; the next subscribe starts a new one."""
+        with self._lock:
+            if self._subscriptions:
+                return False
+            self._thread = None
+            return True
+
+    # -- watcher
+    def _run(self):
+        try:
+            if self.mode in ("auto", "changestream") and self.source != "poll":
+                try:
+                    self.source = "changestream"
+                    self._watch()
+                    return
+                except OperationFailure as e:
+                    if self.mode == "changestream" or e.code != CHANGE_STREAMS_UNSUPPORTED:
+                        raise
+                    logger.info("Change streams need a replica set; polling every %.0fs instead", LIVE_POLL_INTERVAL)
+            self.source = "poll"
+            self._poll()
+        except Exception:
+            logger.exception("Live watcher stopped")
+            with self._lock:
+                self._thread = None
+
+    def _watch(self):
+        """Follow counter updates on artworks and new comments through one change stream.
+
+        Like deletions carry only the like's _id, so counts come from the
+        artworks' denormalized counters rather than the likes themselves.
+        """
+        counters_changed = {"$or": [
+            {f"updateDescription.updatedFields.{field}": {"$exists": True}} for field in COUNT_FIELDS
+        ]}
+        pipeline = [{"$match": {"$or": [
+            {"ns.coll": "comments", "operationType": "insert"},
+            {"ns.coll": "artworks", "operationType": "update", **counters_changed},
+        ]}}]
+        resume_token = None
+        while not self._idle():
+            try:
+                with get_db().watch(pipeline, resume_after=resume_token, max_await_time_ms=1000) as stream:
+                    while not self._idle():
+                        change = stream.try_next()
+                        resume_token = stream.resume_token
+                        if change is not None:
+                            self._dispatch(change)
+            except OperationFailure as e:
+                if e.code == CHANGE_STREAMS_UNSUPPORTED:
+                    raise
+                logger.warning("Change stream failed, resuming: %s", e)
+                time.sleep(1)
+            except PyMongoError as e:
+                logger.warning("Change stream interrupted, resuming: %s", e)
+                time.sleep(1)
+            else:
+                return
+
+    def _dispatch(self, change):
+        if change["ns"]["coll"] == "comments":
+            self._publish_comments([change["fullDocument"]])
+            return
+        artwork_id = str(change["documentKey"]["_id"])
+        updated = change["updateDescription"]["updatedFields"]
+        counts = {field: updated[field] for field in COUNT_FIELDS if field in updated}
+        self.publish(artwork_id, "counts", {"artwork_id": artwork_id, **counts})
+
+    def _publish_comments(self, comments):
+        users = get_user_summaries(c["user_id"] for c in comments)
+        for doc in comments:
+            comment = Comment.from_doc(doc)
+            comment.user = users.get(str(doc["user_id"]))
+            self.publish(str(doc["artwork_id"]), "comment", comment)
+
+    def _poll(self):
+        """Standalone fallback: one counts query and one new-comments query per interval for all watched artworks."""
+        counts = {}
+        since = datetime.now(timezone.utc)
+        while not self._idle():
+            time.sleep(LIVE_POLL_INTERVAL)
+            ids = [ObjectId(artwork_id) for artwork_id in self.watched_ids()]
+            if not ids:
+                continue
+            try:
+                for doc in get_collection("artworks").find({"_id": {"$in": ids}}, {field: 1 for field in COUNT_FIELDS}):
+                    artwork_id = str(doc["_id"])
+                    current = {field: doc.get(field, 0) for field in COUNT_FIELDS}
+                    previous = counts.get(artwork_id)
+                    counts[artwork_id] = current
+                    # the first poll only records a baseline; clients got a snapshot on connect
+                    changed = {f: v for f, v in current.items() if previous and previous[f] != v}
+                    if changed:
+                        self.publish(artwork_id, "counts", {"artwork_id": artwork_id, **changed})
+                new_comments = list(
+                    get_collection("comments").find({"artwork_id": {"$in": ids}, "created_at": {"$gt": since}})
+                    .sort("created_at", 1)
+                )
+                if new_comments:
+                    since = new_comments[-1]["created_at"]
+                    self._publish_comments(new_comments)
+            except PyMongoError as e:
+                logger.warning("Live poll failed: %s", e)
+            for artwork_id in set(counts) - {str(i) for i in ids}:
+                del counts[artwork_id]
+
+    def stats(self):
+        return {"subscribers": self.subscribers, "artworks": len(self.watched_ids()),
+                "published": self.published, "source": self.source}
+
+hub = LiveHub()
+
+# -- streaming
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _snapshot(artwork_ids):
+    ids = [ObjectId(artwork_id) for artwork_id in artwork_ids]
+    projection = {field: 1 for field in COUNT_FIELDS}
+    return [
+        {"artwork_id": str(doc["_id"]), **{field: doc.get(field, 0) for field in COUNT_FIELDS}}
+        for doc in get_collection("artworks").find({"_id": {"$in": ids}}, projection)
+    ]
+
+def event_stream(artwork_ids, comments=False):
+    """SSE response following `artwork_ids`; 503 when the subscriber limit is reached."""
+    subscription = hub.subscribe(artwork_ids, comments)
+    if subscription is None:
+        response = jsonify({'success': False, 'error': 'Too many live connections'})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(LIVE_RETRY_MS // 1000)
+        return response
+
+    def generate():
+        try:
+            yield f"retry: {LIVE_RETRY_MS}\n\n"
+            for counts in _snapshot(subscription.artwork_ids):
+                yield _sse("counts", counts)
+            deadline = time.monotonic() + LIVE_STREAM_SECONDS
+            while time.monotonic() < deadline and not subscription.dropped:
+                try:
+                    event, data = subscription.events.get(timeout=LIVE_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                if event == "comment":
+                    # rendered per viewer so the author sees their edit/delete menu
+                    data = {"artwork_id": str(data.artwork_id), "comment_id": str(data._id),
+                            "html": render_template('comment_list.html', comments=[data])}
+                yield _sse(event, data)
+        finally:
+            hub.unsubscribe(subscription)
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # stop nginx from buffering the stream
+    return response
+
+def init_app(app):
+    """Register the per-artwork and multiplexed feed event streams."""
+
+    @app.route('/api/artwork/<artwork_id>/live')
+    def artwork_live(artwork_id):
+        """Counts and new comments for one artwork as text/event-stream"""
+        if not ObjectId.is_valid(artwork_id):
+            return jsonify({'success': False, 'error': 'Invalid artwork id'}), 400
+        return event_stream([artwork_id], comments=True)
+
+    @app.route('/api/live')
+    def feed_live():
+        """Counts for the artworks on screen, e.g. /api/live?artworks=<id>,<id>"""
+        artwork_ids = [a for a in request.args.get('artworks', '').split(',') if a]
+        if not artwork_ids or len(artwork_ids) > LIVE_MAX_ARTWORKS:
+            return jsonify({'success': False, 'error': f'Pass 1 to {LIVE_MAX_ARTWORKS} artwork ids'}), 400
+        if not all(ObjectId.is_valid(a) for a in artwork_ids):
+            return jsonify({'success': False, 'error': 'Invalid artwork id'}), 400
+        return event_stream(artwork_ids)
@@ -0,0 +1,189 @@
+# media.py
+import hashlib
+import http.client
+import io
+import ipaddress
+import os
+import urllib.request
+
+from bson.objectid import ObjectId
+from flask import send_from_directory
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # images are served from image_url as-is without Pillow
+    Image = None
+
+from db import get_collection
+from render_cache import bump_content_version
+
+MEDIA_ROOT = os.getenv("MEDIA_ROOT", os.path.join(os.path.dirname(os.path.abspath(__file__)), "media"))
+MEDIA_URL = "/media/"
+IMAGE_WIDTHS = tuple(int(w) for w in os.getenv("IMAGE_WIDTHS", "320,640,1280").split(","))
+MAX_IMAGE_BYTES = int(os.getenv("MAX_IMAGE_BYTES", 20 * 1024 * 1024))
+IMAGE_FETCH_TIMEOUT = float(os.getenv("IMAGE_FETCH_TIMEOUT", 10))
+IMAGE_MAX_REDIRECTS = int(os.getenv("IMAGE_MAX_REDIRECTS", 3))
+MEDIA_MAX_AGE = 365 * 24 * 3600
+
+ORIGINAL_EXTENSIONS = {"JPEG": "jpg", "PNG": "png", "GIF": "gif", "WEBP": "webp"}
+
+# -- content-addressed store
+def _media_path(digest, name):
+    return os.path.join(MEDIA_ROOT, digest[:2], digest, name)
+
+def _media_url(digest, name):
+    return f"{MEDIA_URL}{digest[:2]}/{digest}/{name}"
+
+def _write_once(path, data):
+    """Files are named by content hash, so an existing file never needs rewriting."""
+    if os.path.exists(path):
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def _open_image(data):
+    if Image is None:
+        raise RuntimeError("image processing requires the 'Pillow' package")
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.load()
+    except Exception as e:
+        raise ValueError("Not a supported image file") from e
+    return image
+
+def save_original(data):
+    """Store an uploaded image unchanged and return its /media/ URL."""
+    if len(data) > MAX_IMAGE_BYTES:
+        raise ValueError("Image is too large")
+    image = _open_image(data)
+    ext = ORIGINAL_EXTENSIONS.get(image.format)
+    if ext is None:
+        raise ValueError("Unsupported image format")
+    digest = hashlib.sha256(data).hexdigest()
+    name = f"original.{ext}"
+    _write_once(_media_path(digest, name), data)
+    return _media_url(digest, name)
+
+# -- remote fetches
+# image_url is user input, so fetches may only reach public addresses. The
+# check runs on the connected socket, which covers every redirect hop and a
+# hostname that resolves differently between a check and the connect.
+def _require_public(sock):
+    address = ipaddress.ip_address(sock.getpeername()[0].split("%", 1)[0])
+    if not address.is_global:
+        sock.close()
+        raise ValueError(f"Image URL resolves to a non-public address ({address})")
+
+class _PublicHTTPConnection(http.client.HTTPConnection):
+    def connect(self):
+        super().connect()
+        _require_public(self.sock)
+
+class _PublicHTTPSConnection(http.client.HTTPSConnection):
+    def connect(self):
+        super().connect()
+        _require_public(self.sock)
+
+class _PublicHTTPHandler(urllib.request.HTTPHandler):
+    def http_open(self, req):
+        return self.do_open(_PublicHTTPConnection, req)
+
+class _PublicHTTPSHandler(urllib.request.HTTPSHandler):
+    def https_open(self, req):
+        return self.do_open(_PublicHTTPSConnection, req, context=self._context)
+
+class _RedirectHandler(urllib.request.HTTPRedirectHandler):
+    max_redirections = IMAGE_MAX_REDIRECTS
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        if not newurl.startswith(("http://", "https://")):
+            raise ValueError("Image URL redirects to an unsupported scheme")
+        return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+def _opener():
+    # only these handlers: no proxies from the environment, no file:// or ftp://
+    opener = urllib.request.OpenerDirector()
+    for handler in (_PublicHTTPHandler(), _PublicHTTPSHandler(), _RedirectHandler(),
+                    urllib.request.HTTPDefaultErrorHandler(), urllib.request.HTTPErrorProcessor()):
+        opener.add_handler(handler)
+    return opener
+
+def fetch_image(url):
+    """Read image bytes from the local media store or a remote URL."""
+    if url.startswith(MEDIA_URL):
+        path = os.path.abspath(os.path.join(MEDIA_ROOT, url[len(MEDIA_URL):]))
+        if not path.startswith(os.path.abspath(MEDIA_ROOT) + os.sep):
+            raise ValueError("Invalid media path")
+        with open(path, "rb") as f:
+            return f.read()
+    if not url.startswith(("http://", "https://")):
+        raise ValueError("Unsupported image URL")
+    req = urllib.request.Request(url, headers={"User-Agent": "enoughart-media/1.0"})
+    with _opener().open(req, timeout=IMAGE_FETCH_TIMEOUT) as response:
+        data = response.read(MAX_IMAGE_BYTES + 1)
+    if len(data) > MAX_IMAGE_BYTES:
+        raise ValueError("Image is too large")
+    return data
+
+# -- variants
+def build_variants(data):
+    """Write WebP and JPEG renditions at each IMAGE_WIDTHS size and describe them.
+
+    Widths larger than the original are skipped; the original width is used
+    instead so small images still get a WebP copy.
+    """
+    image = ImageOps.exif_transpose(_open_image(data))
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+    digest = hashlib.sha256(data).hexdigest()
+
+    widths = [w for w in IMAGE_WIDTHS if w < image.width] or [image.width]
+    variants = {"hash": digest, "width": image.width, "height": image.height, "webp": [], "jpeg": []}
+    for width in widths:
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.LANCZOS)
+        for fmt, ext, options in (("webp", "webp", {"quality": 80, "method": 4}),
+                                  ("jpeg", "jpg", {"quality": 82, "optimize": True, "progressive": True})):
+            name = f"{width}.{ext}"
+            path = _media_path(digest, name)
+            if not os.path.exists(path):
+                frame = resized.convert("RGB") if fmt == "jpeg" else resized
+                out = io.BytesIO()
+                frame.save(out, format=fmt.upper(), **options)
+                _write_once(path, out.getvalue())
+            variants[fmt].append({"width": width, "url": _media_url(digest, name)})
+    return variants
+
+def process_artwork_image(artwork_id, image_url):
+    """Generate variants for an artwork's image and attach them to the artwork.
+
+    The update only applies if image_url is unchanged, so a slow job for an
+    old image can't overwrite a newer edit. Runs as the process_artwork_image
+    job (see tasks.py), which retries it if the fetch fails.
+    """
+    variants = build_variants(fetch_image(image_url))
+    result = get_collection("artworks").update_one(
+        {"_id": ObjectId(artwork_id), "image_url": image_url},
+        {"$set": {"image_variants": variants}}
+    )
+    if result.modified_count:
+        bump_content_version()
+    return variants
+
+# -- templates
+def srcset(variants, fmt="webp"):
+    return ", ".join(f"{v['url']} {v['width']}w" for v in (variants or {}).get(fmt, []))
+
+def init_app(app):
+    """Serve the media store with immutable cache headers and add the srcset filter."""
+    app.add_template_filter(srcset, "srcset")
+
+    @app.route('/media/<path:filename>')
+    def media_file(filename):
+        """Content-addressed image files"""
+        response = send_from_directory(MEDIA_ROOT, filename, max_age=MEDIA_MAX_AGE)
+        response.headers['Cache-Control'] = f'public, max-age={MEDIA_MAX_AGE}, immutable'
+        return response
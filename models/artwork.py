@@ -1,58 +1,78 @@
 # In models/artwork.py
 
-from db import artworks_collection
+from db import get_collection, read_collection
+from models.records import Artwork
 from bson.objectid import ObjectId
 from datetime import datetime, timezone
 
 # -- artworks
-def add_artwork(artist_id, title, description, image_url, tags=[]):
-    artwork = {
-        "artist_id": artist_id,
+def add_artwork(artist_id, title, description, image_url, tags=None, medium=None, year=None,
+                price=None, process_images=None):
+    artwork_data = {
+        "artist_id": str(artist_id),
         "title": title,
         "description": description,
         "image_url": image_url,
-        "tags": tags,
+        "tags": tags or [],
         "medium": medium,
         "year": year,
         "price": price,
-        "process_images": process_images,
+        "process_images": process_images or [],
+        "likes_count": 0,
+        "comments_count": 0,
         "created_at": datetime.now(timezone.utc)
     }
-    return artworks_collection.insert_one(artwork_data)
+    return get_collection("artworks").insert_one(artwork_data)
 
 def get_all_artworks():
-    return list(artworks_collection.find().sort("created_at", -1))
+    return list(get_collection("artworks").find().sort("created_at", -1))
 
 def get_artwork_by_id(artwork_id):
     try:
-        return artworks_collection.find_one({"_id": ObjectId(artwork_id)})
+        return get_collection("artworks").find_one({"_id": ObjectId(artwork_id)})
     except:
         return None
 
 def get_artworks_by_artist(artist_id):
-    return list(artworks_collection.find({"artist_id": artist_id}).sort("created_at", -1))
+    return list(get_collection("artworks").find({"artist_id": artist_id}).sort("created_at", -1))
 
 def update_artwork(artwork_id, update_data):
-    artworks_collection.update_one(
+    get_collection("artworks").update_one(
         {"_id": ObjectId(artwork_id)},
         {"$set": update_data}
     )
 
 def delete_artwork(artwork_id):
-    artworks_collection.delete_one({"_id": ObjectId(artwork_id)})
+    get_collection("artworks").delete_one({"_id": ObjectId(artwork_id)})
 
-def search_artworks(keyword):
-    query = {"$or": [
-        {"title": {"$regex": keyword, "$options": "i"}},
-        {"description": {"$regex": keyword, "$options": "i"}},
-        {"tags": {"$regex": keyword, "$options": "i"}}
-    ]}
-    return list(artworks_collection.find(query))
-
-def filter_artworks(medium=None, year=None):
+def build_search_query(keyword=None, medium=None, year=None, tags=None):
+    """Build one query that combines $text search with the tag/medium/year filters."""
     query = {}
+    if keyword:
+        query["$text"] = {"$search": keyword}
+    if tags:
+        query["tags"] = {"$all": list(tags)}
     if medium:
         query["medium"] = medium
     if year:
         query["year"] = year
-    return list(artworks_collection.find(query))
\ No newline at end of file
+    return query
+
+def search_artworks(keyword, medium=None, year=None, skip=0, limit=None, tags=None):
+    """Full-text search over title, tags and description, best matches first.
+
+    Served by the weighted text index declared in indexes.py, so it never
+    scans the whole collection the way the old $regex query did.
+    """
+    query = build_search_query(keyword, medium, year, tags)
+    projection = Artwork.projection("card")
+    projection["score"] = {"$meta": "textScore"}
+    cursor = read_collection("artworks").find(query, projection)
+    cursor = cursor.sort([("score", {"$meta": "textScore"}), ("_id", -1)]).skip(skip)
+    if limit:
+        cursor = cursor.limit(limit)
+    return Artwork.from_docs(cursor)
+
+def filter_artworks(medium=None, year=None):
+    query = build_search_query(medium=medium, year=year)
+    return list(read_collection("artworks").find(query).sort([("created_at", -1), ("_id", -1)]))
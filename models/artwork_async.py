@@ -0,0 +1,60 @@
+# models/artwork_async.py
+import asyncio
+
+from async_db import read_collection
+from models.feed import FEED_SORT, decode_cursor, encode_cursor
+from models.like_async import get_liked_artwork_ids
+from models.user_async import get_user_summaries
+from models.records import Artwork
+from bson.objectid import ObjectId
+
+# Async counterparts of models/artwork.py and models/feed.py.
+async def get_artwork_by_id(artwork_id):
+    try:
+        doc = await read_collection("artworks").find_one({"_id": ObjectId(artwork_id)}, Artwork.projection("detail"))
+        return Artwork.from_doc(doc)
+    except:
+        return None
+
+async def count_artworks(query=None):
+    return await read_collection("artworks").count_documents(query or {})
+
+async def get_artwork_page(query=None, cursor=None, limit=24):
+    """Async version of models.feed.get_artwork_page."""
+    filt = dict(query or {})
+    position = decode_cursor(cursor) if cursor else None
+    if position:
+        created_at, oid = position
+        after = {"$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": oid}},
+        ]}
+        filt = {"$and": [filt, after]} if filt else after
+
+    cursor = read_collection("artworks").find(filt, Artwork.projection("card")).sort(FEED_SORT).limit(limit + 1)
+    artworks = Artwork.from_docs(await cursor.to_list(length=None))
+    next_cursor = None
+    if len(artworks) > limit:
+        artworks = artworks[:limit]
+        next_cursor = encode_cursor(artworks[-1])
+    return artworks, next_cursor
+
+async def hydrate_artworks(artworks, viewer_id=None, with_artist=True):
+    """Async version of models.feed.hydrate_artworks; the artist and liked lookups run concurrently."""
+    if not artworks:
+        return artworks
+
+    async def no_artists():
+        return {}
+
+    artists, liked = await asyncio.gather(
+        get_user_summaries(a["artist_id"] for a in artworks) if with_artist else no_artists(),
+        get_liked_artwork_ids(viewer_id, [a["_id"] for a in artworks]),
+    )
+    for artwork in artworks:
+        if with_artist:
+            artwork["artist"] = artists.get(str(artwork["artist_id"]))
+        artwork.setdefault("likes_count", 0)
+        artwork.setdefault("comments_count", 0)
+        artwork["user_liked"] = artwork["_id"] in liked
+    return artworks
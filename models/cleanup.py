@@ -0,0 +1,181 @@
+# models/cleanup.py
+"""Cascade deletes and orphan garbage collection for likes and comments."""
+import os
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from db import get_collection
+from models.facets import apply_facet_changes, facet_fields
+
+CASCADE_BATCH_SIZE = int(os.getenv("CASCADE_BATCH_SIZE", 500))
+GC_BATCH_SIZE = int(os.getenv("GC_BATCH_SIZE", 1000))
+# pause between GC batches so a sweep doesn't starve the app of I/O
+GC_THROTTLE_SECONDS = float(os.getenv("GC_THROTTLE_SECONDS", 0.1))
+
+# collection name -> counter field on the artwork
+DEPENDENTS = {
+    "likes": "likes_count",
+    "comments": "comments_count",
+}
+
+def _to_object_id(v):
+    if isinstance(v, ObjectId):
+        return v
+    try:
+        return ObjectId(v)
+    except Exception:
+        return v
+
+# -- batched deletes
+def delete_in_batches(collection, filt, fields=(), batch_size=CASCADE_BATCH_SIZE, on_batch=None):
+    """Delete everything matching `filt`, at most batch_size documents per delete_many.
+
+    `on_batch(docs)` is called after each batch with the deleted documents'
+    _id and `fields`. Returns the number of documents deleted.
+    """
+    projection = {field: 1 for field in fields}
+    deleted = 0
+    while True:
+        docs = list(collection.find(filt, projection or {"_id": 1}).limit(batch_size))
+        if not docs:
+            return deleted
+        deleted += collection.delete_many({"_id": {"$in": [doc["_id"] for doc in docs]}}).deleted_count
+        if on_batch:
+            on_batch(docs)
+
+def _decrement_counters(field, docs):
+    """Take deleted likes/comments off their artworks' counters."""
+    per_artwork = Counter(doc["artwork_id"] for doc in docs)
+    ops = [
+        # a counter already below n has drifted; reconcile-counters fixes it
+        UpdateOne({"_id": artwork_id, field: {"$gte": amount}}, {"$inc": {field: -amount}})
+        for artwork_id, amount in per_artwork.items()
+    ]
+    if ops:
+        get_collection("artworks").bulk_write(ops, ordered=False)
+
+def _decrement_followers(follows):
+    ops = [UpdateOne({"_id": follow["followee_id"], "followers_count": {"$gt": 0}}, {"$inc": {"followers_count": -1}})
+           for follow in follows]
+    if ops:
+        get_collection("users").bulk_write(ops, ordered=False)
+
+# -- cascades
+def cascade_artwork(artwork_id, batch_size=CASCADE_BATCH_SIZE):
+    """Remove the likes, comments, ranking and timeline entries of an artwork that was deleted.
+
+    Returns {"likes": n, "comments": n}. Safe to re-run.
+    """
+    artwork_id = _to_object_id(artwork_id)
+    removed = {
+        name: delete_in_batches(get_collection(name), {"artwork_id": artwork_id}, batch_size=batch_size)
+        for name in DEPENDENTS
+    }
+    get_collection("rankings").delete_many({"artwork._id": artwork_id})
+    delete_in_batches(get_collection("timelines"), {"artwork_id": artwork_id}, batch_size=batch_size)
+    return removed
+
+def cascade_user(user_id, batch_size=CASCADE_BATCH_SIZE):
+    """Remove a deleted user's artworks (with their dependents), likes, comments, follows and timeline.
+
+    Likes and comments the user left on other artworks are taken off those
+    artworks' counters, and their follows off the artists' followers_count.
+    Returns {"artworks": n, "likes": n, "comments": n}.
+    """
+    user_id = _to_object_id(user_id)
+    removed = Counter()
+
+    def remove_dependents(artworks):
+        for artwork in artworks:
+            apply_facet_changes(before=facet_fields(artwork))
+            removed.update(cascade_artwork(artwork["_id"], batch_size))
+
+    # artist_id is stored as a string
+    removed["artworks"] = delete_in_batches(
+        get_collection("artworks"), {"artist_id": str(user_id)}, fields=("tags", "medium", "year"),
+        batch_size=batch_size, on_batch=remove_dependents
+    )
+    for name, field in DEPENDENTS.items():
+        removed[name] += delete_in_batches(
+            get_collection(name), {"user_id": user_id}, fields=("artwork_id",), batch_size=batch_size,
+            on_batch=lambda docs, field=field: _decrement_counters(field, docs)
+        )
+    delete_in_batches(get_collection("follows"), {"follower_id": user_id}, fields=("followee_id",),
+                      batch_size=batch_size, on_batch=_decrement_followers)
+    delete_in_batches(get_collection("follows"), {"followee_id": user_id}, batch_size=batch_size)
+    delete_in_batches(get_collection("timelines"), {"user_id": user_id}, batch_size=batch_size)
+    return dict(removed)
+
+# -- orphan collection
+class GCStats:
+    def __init__(self, resumed_from=None):
+        self.scanned = 0
+        self.orphans = 0
+        self.removed = 0
+        self.resumed_from = resumed_from
+        self.finished = False
+        self.started = time.perf_counter()
+
+    @property
+    def seconds(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def rate(self):
+        return self.scanned / self.seconds if self.seconds else 0.0
+
+def _checkpoint_id(name):
+    return f"gc:{name}"
+
+def _existing_ids(collection, ids):
+    return {doc["_id"] for doc in collection.find({"_id": {"$in": list(ids)}}, {"_id": 1})}
+
+def collect_orphans(name, dry_run=False, batch_size=GC_BATCH_SIZE, throttle=GC_THROTTLE_SECONDS,
+                    restart=False, max_batches=None, progress=None):
+    """Find and delete likes or comments whose artwork or user no longer exists.
+
+    Walks the collection in _id order one batch at a time and checks each
+    batch with two $in lookups. The position is saved after every batch, so
+    an interrupted run picks up where it stopped. A dry run counts orphans
+    without deleting anything or moving the saved position.
+    `progress(stats)` is called after every batch.
+    """
+    collection, field = get_collection(name), DEPENDENTS[name]
+    checkpoint = None if restart else get_collection("maintenance").find_one({"_id": _checkpoint_id(name)})
+    last_id = checkpoint["last_id"] if checkpoint else None
+    stats = GCStats(resumed_from=last_id)
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        filt = {"_id": {"$gt": last_id}} if last_id else {}
+        docs = list(collection.find(filt, {"artwork_id": 1, "user_id": 1}).sort("_id", 1).limit(batch_size))
+        if not docs:
+            stats.finished = True
+            break
+        artworks = _existing_ids(get_collection("artworks"), {doc["artwork_id"] for doc in docs})
+        users = _existing_ids(get_collection("users"), {doc["user_id"] for doc in docs})
+        orphans = [doc for doc in docs if doc["artwork_id"] not in artworks or doc["user_id"] not in users]
+        stats.scanned += len(docs)
+        stats.orphans += len(orphans)
+        last_id = docs[-1]["_id"]
+        batches += 1
+        if not dry_run:
+            if orphans:
+                stats.removed += collection.delete_many({"_id": {"$in": [doc["_id"] for doc in orphans]}}).deleted_count
+                # orphans of a deleted user may still sit on a live artwork's counter
+                _decrement_counters(field, [doc for doc in orphans if doc["artwork_id"] in artworks])
+            get_collection("maintenance").update_one(
+                {"_id": _checkpoint_id(name)},
+                {"$set": {"last_id": last_id, "updated_at": datetime.now(timezone.utc)}},
+                upsert=True
+            )
+        if progress:
+            progress(stats)
+        if throttle:
+            time.sleep(throttle)
+    if stats.finished and not dry_run:
+        get_collection("maintenance").delete_one({"_id": _checkpoint_id(name)})
+    return stats
@@ -1,5 +1,8 @@
 # models/comment.py
-from db import comments_collection
+from db import get_collection, read_collection
+from models.counters import increment_comments
+from models.feed import decode_cursor, encode_cursor
+from models.records import Comment
 from bson import ObjectId
 from datetime import datetime, timezone
 
@@ -21,15 +24,51 @@ def add_comment(artwork_id, user_id, text):
         "created_at": datetime.now(timezone.utc),
         "updated_at": None,
     }
-    res = comments_collection.insert_one(doc)
+    res = get_collection("comments").insert_one(doc)
+    increment_comments(doc["artwork_id"])
     return {"acknowledged": res.acknowledged, "_id": res.inserted_id}
 
 def get_comments_for_artwork(artwork_id, limit=50, skip=0, sort_asc=True):
     a_id = _to_object_id(artwork_id)
     sort_dir = 1 if sort_asc else -1
-    cursor = comments_collection.find({"artwork_id": a_id}).sort("created_at", sort_dir).skip(skip).limit(limit)
+    cursor = get_collection("comments").find({"artwork_id": a_id}).sort("created_at", sort_dir).skip(skip).limit(limit)
     return list(cursor)
 
+def comment_page_pipeline(artwork_id, cursor=None, limit=20):
+    """Aggregation returning one page of comments (oldest first) with their authors joined in.
+
+    Pages are keyed on (created_at, _id), so later pages cost the same as
+    the first. Fetches limit + 1 comments to tell whether there is a next page.
+    """
+    match = {"artwork_id": _to_object_id(artwork_id)}
+    position = decode_cursor(cursor) if cursor else None
+    if position:
+        created_at, oid = position
+        match["$or"] = [
+            {"created_at": {"$gt": created_at}},
+            {"created_at": created_at, "_id": {"$gt": oid}},
+        ]
+    return [
+        {"$match": match},
+        {"$sort": {"created_at": 1, "_id": 1}},
+        {"$limit": limit + 1},
+        {"$lookup": {"from": "users", "localField": "user_id", "foreignField": "_id", "as": "user"}},
+        {"$unwind": {"path": "$user", "preserveNullAndEmptyArrays": True}},
+        {"$project": Comment.projection("list")},
+    ]
+
+def split_comment_page(comments, limit):
+    """Trim the extra comment fetched by comment_page_pipeline and return (comments, next_cursor)."""
+    if len(comments) > limit:
+        comments = comments[:limit]
+        return comments, encode_cursor(comments[-1])
+    return comments, None
+
+def get_comment_page(artwork_id, cursor=None, limit=20):
+    """Return (comments, next_cursor); each comment has its author under "user"."""
+    comments = Comment.from_docs(read_collection("comments").aggregate(comment_page_pipeline(artwork_id, cursor, limit)))
+    return split_comment_page(comments, limit)
+
 def update_comment(comment_id, user_id, new_text, admin=False):
     """Update a comment's text. Only the owner can edit unless admin=True."""
     c_id = _to_object_id(comment_id)
@@ -38,7 +77,7 @@ def update_comment(comment_id, user_id, new_text, admin=False):
     if not admin:
         filt["user_id"] = u_id
     update = {"$set": {"text": new_text, "updated_at": datetime.now(timezone.utc)}}
-    return comments_collection.update_one(filt, update)
+    return get_collection("comments").update_one(filt, update)
 
 def delete_comment(comment_id, user_id=None, admin=False):
     """Delete a comment. Only the owner can delete unless admin=True."""
@@ -46,8 +85,13 @@ def delete_comment(comment_id, user_id=None, admin=False):
     filt = {"_id": c_id}
     if not admin and user_id is not None:
         filt["user_id"] = _to_object_id(user_id)
-    return comments_collection.delete_one(filt)
+    deleted = get_collection("comments").find_one_and_delete(filt, projection={"artwork_id": 1})
+    if deleted:
+        increment_comments(deleted["artwork_id"], -1)
+    return deleted
 
 def count_comments(artwork_id):
+    """Read the denormalized comments_count kept on the artwork."""
     a_id = _to_object_id(artwork_id)
-    return comments_collection.count_documents({"artwork_id": a_id})
+    artwork = read_collection("artworks").find_one({"_id": a_id}, {"comments_count": 1})
+    return artwork.get("comments_count", 0) if artwork else 0
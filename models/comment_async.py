@@ -0,0 +1,11 @@
+# models/comment_async.py
+from async_db import read_collection
+from models.comment import comment_page_pipeline, split_comment_page
+from models.records import Comment
+
+# Async counterparts of the read helpers in models/comment.py.
+async def get_comment_page(artwork_id, cursor=None, limit=20):
+    """Async version of models.comment.get_comment_page."""
+    pipeline = comment_page_pipeline(artwork_id, cursor, limit)
+    comments = Comment.from_docs(await read_collection("comments").aggregate(pipeline).to_list(length=None))
+    return split_comment_page(comments, limit)
@@ -0,0 +1,73 @@
+# models/counters.py
+from db import get_collection
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+
+# counter field -> collection it counts
+COUNTERS = {
+    "likes_count": "likes",
+    "comments_count": "comments",
+}
+
+def _to_object_id(v):
+    if isinstance(v, ObjectId):
+        return v
+    try:
+        return ObjectId(v)
+    except Exception:
+        return v
+
+# -- denormalized counters
+def increment_counter(artwork_id, field, amount=1):
+    """Atomically $inc a counter on an artwork and return its new value."""
+    filt = {"_id": _to_object_id(artwork_id)}
+    if amount < 0:
+        # never drive a counter negative; reconcile_counters fixes any drift
+        filt[field] = {"$gt": 0}
+    doc = get_collection("artworks").find_one_and_update(
+        filt,
+        {"$inc": {field: amount}},
+        projection={field: 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    return doc.get(field, 0) if doc else 0
+
+def increment_likes(artwork_id, amount=1):
+    return increment_counter(artwork_id, "likes_count", amount)
+
+def increment_comments(artwork_id, amount=1):
+    return increment_counter(artwork_id, "comments_count", amount)
+
+def _actual_counts(name):
+    pipeline = [{"$group": {"_id": "$artwork_id", "count": {"$sum": 1}}}]
+    return {row["_id"]: row["count"] for row in get_collection(name).aggregate(pipeline, allowDiskUse=True)}
+
+def reconcile_counters(dry_run=False, batch_size=1000):
+    """Recompute every artwork's counters from likes/comments and fix drift.
+
+    Returns the number of artworks whose stored counters were wrong.
+    """
+    actual = {field: _actual_counts(name) for field, name in COUNTERS.items()}
+    projection = {field: 1 for field in COUNTERS}
+    drifted = 0
+    ops = []
+
+    for artwork in get_collection("artworks").find({}, projection).batch_size(batch_size):
+        fixes = {}
+        for field in COUNTERS:
+            expected = actual[field].get(artwork["_id"], 0)
+            if artwork.get(field) != expected:
+                fixes[field] = expected
+        if not fixes:
+            continue
+        drifted += 1
+        if dry_run:
+            continue
+        ops.append(UpdateOne({"_id": artwork["_id"]}, {"$set": fixes}))
+        if len(ops) >= batch_size:
+            get_collection("artworks").bulk_write(ops, ordered=False)
+            ops = []
+
+    if ops:
+        get_collection("artworks").bulk_write(ops, ordered=False)
+    return drifted
@@ -0,0 +1,92 @@
+# models/facets.py
+import os
+
+from pymongo import ReplaceOne, UpdateOne
+
+from db import get_collection, read_collection
+
+FACETS = ("tag", "medium", "year")
+FACET_SIDEBAR_SIZE = int(os.getenv("FACET_SIDEBAR_SIZE", 20))
+
+# -- facet values
+def facet_fields(artwork):
+    """The fields facets are counted from."""
+    if not artwork:
+        return None
+    return {"tags": list(artwork.get("tags") or []), "medium": artwork.get("medium"), "year": artwork.get("year")}
+
+def facet_pairs(fields):
+    """Set of (facet, value) an artwork is counted under; each tag counts once."""
+    if not fields:
+        return set()
+    pairs = {("tag", tag) for tag in fields.get("tags") or [] if tag}
+    if fields.get("medium"):
+        pairs.add(("medium", fields["medium"]))
+    if fields.get("year") is not None:
+        pairs.add(("year", fields["year"]))
+    return pairs
+
+def _facet_id(facet, value):
+    return f"{facet}:{value}"
+
+# -- maintenance
+def apply_facet_changes(before=None, after=None):
+    """Move an artwork's counts from its old facet values to its new ones.
+
+    Pass before=None for a new artwork and after=None for a deleted one.
+    Only the values that actually changed are touched.
+    """
+    old, new = facet_pairs(before), facet_pairs(after)
+    changes = [(pair, -1) for pair in old - new] + [(pair, 1) for pair in new - old]
+    if not changes:
+        return 0
+    get_collection("facets").bulk_write([
+        UpdateOne(
+            {"_id": _facet_id(facet, value)},
+            {"$inc": {"count": amount}, "$setOnInsert": {"facet": facet, "value": value}},
+            upsert=True
+        )
+        for (facet, value), amount in changes
+    ], ordered=False)
+    emptied = [_facet_id(facet, value) for (facet, value), amount in changes if amount < 0]
+    if emptied:
+        get_collection("facets").delete_many({"_id": {"$in": emptied}, "count": {"$lte": 0}})
+    return len(changes)
+
+def rebuild_facets(dry_run=False, batch_size=1000):
+    """Recount every facet value from the artworks and fix drift.
+
+    Returns the number of facet values whose stored count was wrong.
+    """
+    actual = {}
+    projection = {"tags": 1, "medium": 1, "year": 1}
+    for artwork in get_collection("artworks").find({}, projection).batch_size(batch_size):
+        for pair in facet_pairs(artwork):
+            actual[pair] = actual.get(pair, 0) + 1
+
+    stored = {(doc["facet"], doc["value"]): doc["count"] for doc in get_collection("facets").find()}
+    ops = [
+        ReplaceOne({"_id": _facet_id(facet, value)}, {"facet": facet, "value": value, "count": count}, upsert=True)
+        for (facet, value), count in actual.items() if stored.get((facet, value)) != count
+    ]
+    stale = [_facet_id(facet, value) for facet, value in stored if (facet, value) not in actual]
+    if not dry_run:
+        for start in range(0, len(ops), batch_size):
+            get_collection("facets").bulk_write(ops[start:start + batch_size], ordered=False)
+        if stale:
+            get_collection("facets").delete_many({"_id": {"$in": stale}})
+    return len(ops) + len(stale)
+
+# -- reads
+def get_facet_counts(limit=FACET_SIDEBAR_SIZE):
+    """Return {facet: [(value, count), ...]} with the most used values first."""
+    collection = read_collection("facets")
+    return {
+        facet: [
+            (doc["value"], doc["count"])
+            for doc in collection.find({"facet": facet, "count": {"$gt": 0}}, {"_id": 0, "value": 1, "count": 1})
+            .sort([("count", -1), ("value", 1)])
+            .limit(limit)
+        ]
+        for facet in FACETS
+    }
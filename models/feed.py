@@ -0,0 +1,96 @@
+# models/feed.py
+from db import read_collection
+from models.records import Artwork, Like
+from models.user import get_user_summaries
+from bson import ObjectId
+from bson.errors import InvalidId
+from datetime import datetime, timezone
+
+FEED_SORT = [("created_at", -1), ("_id", -1)]
+
+def _to_object_id(v):
+    if isinstance(v, ObjectId):
+        return v
+    try:
+        return ObjectId(v)
+    except Exception:
+        return v
+
+# -- feed hydration
+def hydrate_artworks(artworks, viewer_id=None, with_artist=True):
+    """Fill in artist, like/comment counts and the viewer's liked state.
+
+    Like/comment counts are read from the denormalized counters on each
+    artwork, so this costs at most two queries regardless of how many
+    artworks are passed in: one $in for artists missing from the user
+    cache and one $in for the viewer's likes.
+    """
+    if not artworks:
+        return artworks
+
+    artwork_ids = [a["_id"] for a in artworks]
+
+    if with_artist:
+        artists = get_user_summaries(a["artist_id"] for a in artworks)
+        for artwork in artworks:
+            artwork["artist"] = artists.get(str(artwork["artist_id"]))
+
+    liked = set()
+    if viewer_id is not None:
+        liked = {
+            like["artwork_id"]
+            for like in read_collection("likes").find(
+                {"user_id": _to_object_id(viewer_id), "artwork_id": {"$in": artwork_ids}},
+                Like.projection("artwork_ref"),
+            )
+        }
+
+    for artwork in artworks:
+        artwork.setdefault("likes_count", 0)
+        artwork.setdefault("comments_count", 0)
+        artwork["user_liked"] = artwork["_id"] in liked
+
+    return artworks
+
+# -- keyset pagination
+def encode_cursor(artwork):
+    """Encode an artwork's (created_at, _id) position as an opaque cursor string."""
+    created_at = artwork["created_at"]
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    millis = int(created_at.timestamp() * 1000)
+    return f"{millis}_{artwork['_id']}"
+
+def decode_cursor(cursor):
+    """Turn a cursor back into (created_at, _id). Returns None if it is malformed."""
+    try:
+        millis, oid = cursor.split("_", 1)
+        created_at = datetime.fromtimestamp(int(millis) / 1000, tz=timezone.utc)
+        return created_at, ObjectId(oid)
+    except (AttributeError, ValueError, InvalidId):
+        return None
+
+def get_artwork_page(query=None, cursor=None, limit=24, projection="card"):
+    """Return (artworks, next_cursor) for one page ordered newest first.
+
+    Uses keyset pagination on (created_at, _id) so every page costs the
+    same no matter how deep into the collection it is. Artworks are
+    Artwork records holding only the fields of the named projection.
+    """
+    filt = dict(query or {})
+    position = decode_cursor(cursor) if cursor else None
+    if position:
+        created_at, oid = position
+        after = {"$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": oid}},
+        ]}
+        filt = {"$and": [filt, after]} if filt else after
+
+    found = read_collection("artworks").find(filt, Artwork.projection(projection))
+    artworks = Artwork.from_docs(found.sort(FEED_SORT).limit(limit + 1))
+    next_cursor = None
+    if len(artworks) > limit:
+        artworks = artworks[:limit]
+        next_cursor = encode_cursor(artworks[-1])
+    return artworks, next_cursor
@@ -0,0 +1,78 @@
+# models/follow.py
+from db import get_collection, read_collection
+from models.user import invalidate_user
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from datetime import datetime, timezone
+
+def _to_object_id(v):
+    if isinstance(v, ObjectId):
+        return v
+    try:
+        return ObjectId(v)
+    except Exception:
+        return v
+
+def _increment_followers(user_id, amount):
+    filt = {"_id": user_id}
+    if amount < 0:
+        filt["followers_count"] = {"$gt": 0}
+    doc = get_collection("users").find_one_and_update(
+        filt, {"$inc": {"followers_count": amount}},
+        projection={"followers_count": 1}, return_document=ReturnDocument.AFTER,
+    )
+    invalidate_user(user_id)
+    return doc.get("followers_count", 0) if doc else count_followers(user_id)
+
+# -- follows
+def follow(follower_id, followee_id):
+    """Follow an artist. Idempotent, like add_like.
+
+    Returns {"following", "changed", "followers_count"}.
+    """
+    follower = _to_object_id(follower_id)
+    followee = _to_object_id(followee_id)
+    try:
+        result = get_collection("follows").update_one(
+            {"follower_id": follower, "followee_id": followee},
+            {"$setOnInsert": {"created_at": datetime.now(timezone.utc)}},
+            upsert=True,
+        )
+        created = result.upserted_id is not None
+    except DuplicateKeyError:
+        created = False
+    followers_count = _increment_followers(followee, 1) if created else count_followers(followee)
+    return {"following": True, "changed": created, "followers_count": followers_count}
+
+def unfollow(follower_id, followee_id):
+    """Stop following an artist. Idempotent."""
+    follower = _to_object_id(follower_id)
+    followee = _to_object_id(followee_id)
+    removed = get_collection("follows").delete_one({"follower_id": follower, "followee_id": followee}).deleted_count > 0
+    followers_count = _increment_followers(followee, -1) if removed else count_followers(followee)
+    return {"following": False, "changed": removed, "followers_count": followers_count}
+
+def toggle_follow(follower_id, followee_id):
+    """Flip the follow. Tries the unfollow first so it never needs a read."""
+    result = unfollow(follower_id, followee_id)
+    if result["changed"]:
+        return result
+    return follow(follower_id, followee_id)
+
+def is_following(follower_id, followee_id):
+    return read_collection("follows").find_one(
+        {"follower_id": _to_object_id(follower_id), "followee_id": _to_object_id(followee_id)}, {"_id": 1}
+    ) is not None
+
+def count_followers(user_id):
+    """Read the denormalized followers_count kept on the user."""
+    user = read_collection("users").find_one({"_id": _to_object_id(user_id)}, {"followers_count": 1})
+    return user.get("followers_count", 0) if user else 0
+
+def get_follower_batch(followee_id, after=None, limit=1000):
+    """One batch of follow documents for an artist in _id order, for fan-out."""
+    filt = {"followee_id": _to_object_id(followee_id)}
+    if after:
+        filt["_id"] = {"$gt": _to_object_id(after)}
+    return list(get_collection("follows").find(filt, {"follower_id": 1}).sort("_id", 1).limit(limit))
@@ -1,6 +1,8 @@
 # models/like.py
-from db import likes_collection
+from db import get_collection, read_collection
+from models.counters import increment_likes
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 from datetime import datetime, timezone
 
 def _to_object_id(v):
@@ -13,35 +15,72 @@ def _to_object_id(v):
 
 # -- likes
 def add_like(artwork_id, user_id):
-    """Add a like for an artwork by a user. No-op if it already exists."""
+    """Like an artwork. Idempotent: liking twice leaves a single like.
+
+    Relies on the unique (artwork_id, user_id) index, so concurrent requests
+    can't create duplicates. Returns {"liked", "changed", "likes_count"}.
+    """
     a_id = _to_object_id(artwork_id)
     u_id = _to_object_id(user_id)
-    existing = likes_collection.find_one({"artwork_id": a_id, "user_id": u_id})
-    if existing:
-        return {"acknowledged": True, "already_liked": True, "_id": existing.get("_id")}
-    doc = {
-        "artwork_id": a_id,
-        "user_id": u_id,
-        "created_at": datetime.now(timezone.utc),
-    }
-    result = likes_collection.insert_one(doc)
-    return {"acknowledged": result.acknowledged, "_id": result.inserted_id}
+    try:
+        result = get_collection("likes").update_one(
+            {"artwork_id": a_id, "user_id": u_id},
+            {"$setOnInsert": {"created_at": datetime.now(timezone.utc)}},
+            upsert=True,
+        )
+        created = result.upserted_id is not None
+    except DuplicateKeyError:
+        # a concurrent upsert for the same pair won the race
+        created = False
+    likes_count = increment_likes(a_id) if created else count_likes(a_id)
+    return {"liked": True, "changed": created, "likes_count": likes_count}
 
 def remove_like(artwork_id, user_id):
+    """Unlike an artwork. Idempotent: unliking twice is a no-op."""
     a_id = _to_object_id(artwork_id)
     u_id = _to_object_id(user_id)
-    return likes_collection.delete_one({"artwork_id": a_id, "user_id": u_id})
+    result = get_collection("likes").delete_one({"artwork_id": a_id, "user_id": u_id})
+    removed = result.deleted_count > 0
+    likes_count = increment_likes(a_id, -1) if removed else count_likes(a_id)
+    return {"liked": False, "changed": removed, "likes_count": likes_count}
+
+def toggle_like(artwork_id, user_id):
+    """Flip the user's like. Tries the unlike first so it never needs a read."""
+    result = remove_like(artwork_id, user_id)
+    if result["changed"]:
+        return result
+    return add_like(artwork_id, user_id)
+
+def remove_duplicate_likes():
+    """Delete extra likes for the same (artwork, user) pair so the unique index can be built.
+
+    Returns {artwork_id: number removed} so the counters can be corrected.
+    """
+    pipeline = [
+        {"$group": {"_id": {"artwork_id": "$artwork_id", "user_id": "$user_id"},
+                    "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ]
+    removed = {}
+    for group in get_collection("likes").aggregate(pipeline, allowDiskUse=True):
+        extra = sorted(group["ids"])[1:]
+        get_collection("likes").delete_many({"_id": {"$in": extra}})
+        artwork_id = group["_id"]["artwork_id"]
+        removed[artwork_id] = removed.get(artwork_id, 0) + len(extra)
+    return removed
 
 def count_likes(artwork_id):
+    """Read the denormalized likes_count kept on the artwork."""
     a_id = _to_object_id(artwork_id)
-    return likes_collection.count_documents({"artwork_id": a_id})
+    artwork = read_collection("artworks").find_one({"_id": a_id}, {"likes_count": 1})
+    return artwork.get("likes_count", 0) if artwork else 0
 
 def get_likes_for_artwork(artwork_id, limit=100, skip=0):
     a_id = _to_object_id(artwork_id)
-    cursor = likes_collection.find({"artwork_id": a_id}).sort("created_at", 1).skip(skip).limit(limit)
+    cursor = get_collection("likes").find({"artwork_id": a_id}).sort("created_at", 1).skip(skip).limit(limit)
     return list(cursor)
 
 def has_user_liked(artwork_id, user_id):
     a_id = _to_object_id(artwork_id)
     u_id = _to_object_id(user_id)
-    return likes_collection.find_one({"artwork_id": a_id, "user_id": u_id}) is not None
+    return get_collection("likes").find_one({"artwork_id": a_id, "user_id": u_id}) is not None
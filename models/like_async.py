@@ -0,0 +1,29 @@
+# models/like_async.py
+from async_db import read_collection
+from bson import ObjectId
+
+from models.records import Like
+
+def _to_object_id(v):
+    if isinstance(v, ObjectId):
+        return v
+    try:
+        return ObjectId(v)
+    except Exception:
+        return v
+
+# Async counterparts of the read helpers in models/like.py.
+async def has_user_liked(artwork_id, user_id):
+    a_id = _to_object_id(artwork_id)
+    u_id = _to_object_id(user_id)
+    return await read_collection("likes").find_one({"artwork_id": a_id, "user_id": u_id}, Like.projection("exists")) is not None
+
+async def get_liked_artwork_ids(user_id, artwork_ids):
+    """Return the subset of artwork_ids the user has liked, in one $in query."""
+    if user_id is None or not artwork_ids:
+        return set()
+    cursor = read_collection("likes").find(
+        {"user_id": _to_object_id(user_id), "artwork_id": {"$in": list(artwork_ids)}},
+        Like.projection("artwork_ref"),
+    )
+    return {like["artwork_id"] async for like in cursor}
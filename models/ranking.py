@@ -0,0 +1,172 @@
+# models/ranking.py
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+from db import get_collection, read_collection
+from models.records import Artwork
+from render_cache import bump_content_version
+
+logger = logging.getLogger(__name__)
+
+RANKINGS = ("trending", "popular")
+RANKING_SIZE = int(os.getenv("RANKING_SIZE", 200))
+RANKING_REFRESH_SECONDS = int(os.getenv("RANKING_REFRESH_SECONDS", 300))
+TRENDING_WINDOW_DAYS = float(os.getenv("TRENDING_WINDOW_DAYS", 7))
+TRENDING_HALF_LIFE_HOURS = float(os.getenv("TRENDING_HALF_LIFE_HOURS", 24))
+TRENDING_COMMENT_WEIGHT = float(os.getenv("TRENDING_COMMENT_WEIGHT", 2))
+
+# copied into each entry so a ranking page is a single query
+CARD_FIELDS = (
+    "artist_id", "title", "description", "image_url", "image_variants", "tags", "medium",
+    "year", "price", "likes_count", "comments_count", "created_at", "updated_at",
+)
+
+# -- pipelines
+def _decayed(weight, now):
+    """weight halved for every TRENDING_HALF_LIFE_HOURS since the document's created_at."""
+    half_life_ms = TRENDING_HALF_LIFE_HOURS * 3600 * 1000
+    age = {"$divide": [{"$subtract": [now, "$created_at"]}, half_life_ms]}
+    return {"$multiply": [weight, {"$pow": [0.5, age]}]}
+
+def trending_pipeline(now):
+    """Run on likes: time-decayed likes plus weighted comments from the last TRENDING_WINDOW_DAYS."""
+    since = now - timedelta(days=TRENDING_WINDOW_DAYS)
+    return [
+        {"$match": {"created_at": {"$gte": since}}},
+        {"$project": {"_id": 0, "artwork_id": 1, "score": _decayed(1, now)}},
+        {"$unionWith": {"coll": "comments", "pipeline": [
+            {"$match": {"created_at": {"$gte": since}}},
+            {"$project": {"_id": 0, "artwork_id": 1, "score": _decayed(TRENDING_COMMENT_WEIGHT, now)}},
+        ]}},
+        {"$group": {"_id": "$artwork_id", "score": {"$sum": "$score"}}},
+        {"$sort": {"score": -1, "_id": -1}},
+        {"$limit": RANKING_SIZE},
+        {"$lookup": {"from": "artworks", "localField": "_id", "foreignField": "_id", "as": "artwork"}},
+        {"$unwind": "$artwork"},  # drops deleted artworks
+    ]
+
+def popular_pipeline(now):
+    """Run on artworks: all-time most liked, from the denormalized likes_count."""
+    return [
+        {"$match": {"likes_count": {"$gt": 0}}},
+        {"$sort": {"likes_count": -1, "_id": -1}},
+        {"$limit": RANKING_SIZE},
+        {"$project": {"score": "$likes_count", "artwork": "$$ROOT"}},
+    ]
+
+# ranking -> (collection it is computed from, pipeline builder)
+PIPELINES = {
+    "trending": ("likes", trending_pipeline),
+    "popular": ("artworks", popular_pipeline),
+}
+
+def materialize_stages(name, generation):
+    """Number the ranked artworks and $merge them into rankings as one doc per rank."""
+    artwork = {"_id": "$entries._id"}
+    artwork.update({field: f"$entries.artwork.{field}" for field in CARD_FIELDS})
+    return [
+        {"$group": {"_id": None, "entries": {"$push": {"_id": "$_id", "score": "$score", "artwork": "$artwork"}}}},
+        {"$unwind": {"path": "$entries", "includeArrayIndex": "rank"}},
+        {"$project": {
+            "_id": {"$concat": [f"{name}:", {"$toString": "$rank"}]},
+            "ranking": {"$literal": name},
+            "rank": "$rank",
+            "score": "$entries.score",
+            "artwork": artwork,
+            "generation": {"$literal": generation},
+        }},
+        {"$merge": {"into": "rankings", "on": "_id",
+                    "whenMatched": "replace", "whenNotMatched": "insert"}},
+    ]
+
+# -- refresh
+def _meta_id(name):
+    return f"{name}:meta"
+
+def refresh_ranking(name):
+    """Recompute one ranking in the database and record when it was refreshed."""
+    source, pipeline = PIPELINES[name]
+    now = datetime.now(timezone.utc)
+    generation = ObjectId()
+    get_collection(source).aggregate(pipeline(now) + materialize_stages(name, generation))
+    # ranks past the new list's length are left over from a longer previous run
+    get_collection("rankings").delete_many({"ranking": name, "generation": {"$ne": generation}})
+    get_collection("rankings").update_one(
+        {"_id": _meta_id(name)},
+        {"$set": {"refreshed_at": now}, "$unset": {"refreshing_until": ""}},
+        upsert=True
+    )
+    bump_content_version()
+    return now
+
+def build_missing_rankings():
+    """Build every ranking that was never refreshed, so no request has to.
+
+    Returns (built, failures) with the ranking names and (name, error) pairs.
+    A failed ranking is left to the refresh job its first request queues.
+    """
+    built, failures = [], []
+    for name in RANKINGS:
+        if ranking_age(name) is not None or not claim_refresh(name):
+            continue
+        try:
+            refresh_ranking(name)
+            built.append(name)
+        except PyMongoError as e:
+            logger.error("Could not build the %s ranking: %s", name, e)
+            get_collection("rankings").update_one({"_id": _meta_id(name)}, {"$unset": {"refreshing_until": ""}})
+            failures.append((name, str(e)))
+    return built, failures
+
+def ranking_age(name):
+    """Seconds since a ranking was last refreshed, or None if it never was."""
+    meta = get_collection("rankings").find_one({"_id": _meta_id(name)}, {"refreshed_at": 1})
+    if not meta or not meta.get("refreshed_at"):
+        return None
+    refreshed_at = meta["refreshed_at"]
+    if refreshed_at.tzinfo is None:
+        refreshed_at = refreshed_at.replace(tzinfo=timezone.utc)
+    return (datetime.now(timezone.utc) - refreshed_at).total_seconds()
+
+def claim_refresh(name, lease_seconds=RANKING_REFRESH_SECONDS):
+    """Take the right to refresh a ranking so only one worker recomputes it at a time."""
+    now = datetime.now(timezone.utc)
+    meta = get_collection("rankings").find_one_and_update(
+        {"_id": _meta_id(name), "refreshing_until": {"$not": {"$gt": now}}},
+        {"$set": {"refreshing_until": now + timedelta(seconds=lease_seconds)}},
+    )
+    if meta is not None:
+        return True
+    try:
+        get_collection("rankings").insert_one({"_id": _meta_id(name), "refreshing_until": now + timedelta(seconds=lease_seconds)})
+        return True
+    except DuplicateKeyError:
+        return False
+
+# -- reads
+def get_ranking_page(name, cursor=None, limit=24):
+    """Return (artworks, next_cursor) for one page of a materialized ranking.
+
+    The cursor is the rank to start from; entries are read with one query on
+    the (ranking, rank) index.
+    """
+    try:
+        start = max(int(cursor), 0) if cursor else 0
+    except ValueError:
+        start = 0
+    entries = list(
+        read_collection("rankings").find({"ranking": name, "rank": {"$gte": start}}, {"rank": 1, "artwork": 1})
+        .sort("rank", 1)
+        .limit(limit + 1)
+    )
+    next_cursor = str(start + limit) if len(entries) > limit else None
+    artworks = []
+    for entry in entries[:limit]:
+        artwork = Artwork.from_doc(entry["artwork"])
+        artwork.rank = entry["rank"] + 1
+        artworks.append(artwork)
+    return artworks, next_cursor
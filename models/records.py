@@ -0,0 +1,113 @@
+# models/records.py
+"""Slotted records for the document shapes the pages use, each with named projections."""
+
+# cards show at most 100 characters and check whether there are more
+DESCRIPTION_PREVIEW = {"$substrCP": [{"$ifNull": ["$description", ""]}, 0, 101]}
+
+class Record:
+    """A Mongo document reduced to the fields of one projection.
+
+    Fields left out by the projection are simply unset. Records also
+    support item access, `get`, `setdefault` and `in` with field names, so
+    templates and helpers written against raw dicts keep working.
+    """
+    __slots__ = ()
+    PROJECTIONS = {}
+
+    @classmethod
+    def projection(cls, name):
+        """The find() projection for a named use case."""
+        return dict(cls.PROJECTIONS[name])
+
+    @classmethod
+    def from_doc(cls, doc):
+        if doc is None:
+            return None
+        record = cls.__new__(cls)
+        for key, value in doc.items():
+            if key in cls.__slots__:
+                setattr(record, key, value)
+        return record
+
+    @classmethod
+    def from_docs(cls, docs):
+        return [cls.from_doc(doc) for doc in docs]
+
+    def __getitem__(self, key):
+        if key in self.__slots__:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                pass
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.__slots__ and hasattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def to_dict(self):
+        return {key: getattr(self, key) for key in self.__slots__ if hasattr(self, key)}
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+class UserSummary(Record):
+    """The slice of a user shown next to their artworks and comments."""
+    __slots__ = ("_id", "username", "profile_image")
+    PROJECTIONS = {
+        "chip": {"username": 1, "profile_image": 1},
+    }
+
+class Artwork(Record):
+    __slots__ = (
+        "_id", "artist_id", "title", "description", "image_url", "image_variants", "tags", "medium",
+        "year", "price", "process_images", "likes_count", "comments_count", "created_at", "updated_at",
+        # filled in per request
+        "score", "rank", "artist", "user_liked", "card_html",
+    )
+    PROJECTIONS = {
+        "card": {
+            "artist_id": 1, "title": 1, "description": DESCRIPTION_PREVIEW, "image_url": 1,
+            "image_variants": 1, "medium": 1, "year": 1, "price": 1, "likes_count": 1,
+            "comments_count": 1, "created_at": 1, "updated_at": 1,
+        },
+        "detail": {
+            "artist_id": 1, "title": 1, "description": 1, "image_url": 1, "image_variants": 1, "tags": 1,
+            "medium": 1, "year": 1, "price": 1, "process_images": 1, "likes_count": 1,
+            "comments_count": 1, "created_at": 1, "updated_at": 1,
+        },
+    }
+
+class Comment(Record):
+    __slots__ = ("_id", "artwork_id", "user_id", "text", "created_at", "updated_at", "user")
+    PROJECTIONS = {
+        # comment list entries with their author joined in as "user"
+        "list": {"user_id": 1, "text": 1, "created_at": 1, "updated_at": 1,
+                 "user._id": 1, "user.username": 1, "user.profile_image": 1},
+    }
+
+    @classmethod
+    def from_doc(cls, doc):
+        comment = super().from_doc(doc)
+        if comment is not None and isinstance(doc.get("user"), dict):
+            comment.user = UserSummary.from_doc(doc["user"])
+        return comment
+
+class Like(Record):
+    __slots__ = ("_id", "artwork_id", "user_id", "created_at")
+    PROJECTIONS = {
+        "artwork_ref": {"_id": 0, "artwork_id": 1},
+        "exists": {"_id": 1},
+    }
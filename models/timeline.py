@@ -0,0 +1,176 @@
+# models/timeline.py
+"""Personalized home timelines: fan-out-on-write, with fan-out-on-read for large artists."""
+import os
+import random
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from cache import TTLCache
+from db import get_collection, read_collection
+from models.feed import FEED_SORT, decode_cursor, encode_cursor
+from models.follow import get_follower_batch
+from models.records import Artwork
+
+# entries kept per user; older ones are trimmed
+TIMELINE_SIZE = int(os.getenv("TIMELINE_SIZE", 500))
+# a user's timeline is trimmed after about 1 in TIMELINE_TRIM_EVERY deliveries
+TIMELINE_TRIM_EVERY = int(os.getenv("TIMELINE_TRIM_EVERY", 20))
+TIMELINE_BACKFILL = int(os.getenv("TIMELINE_BACKFILL", 50))
+FANOUT_BATCH_SIZE = int(os.getenv("FANOUT_BATCH_SIZE", 1000))
+# artists with at least this many followers are not fanned out; followers read their artworks directly
+FANOUT_MAX_FOLLOWERS = int(os.getenv("FANOUT_MAX_FOLLOWERS", 10000))
+
+TIMELINE_SORT = [("created_at", -1), ("artwork_id", -1)]
+DUPLICATE_KEY = 11000
+
+large_artist_cache = TTLCache(maxsize=1, ttl=float(os.getenv("LARGE_ARTISTS_TTL", 300)))
+
+def _to_object_id(v):
+    if isinstance(v, ObjectId):
+        return v
+    try:
+        return ObjectId(v)
+    except Exception:
+        return v
+
+def _entry(user_id, artwork):
+    return {
+        "user_id": user_id,
+        "artwork_id": artwork["_id"],
+        "artist_id": _to_object_id(artwork["artist_id"]),
+        "created_at": artwork["created_at"],
+    }
+
+def _insert_entries(entries):
+    """Insert timeline entries, ignoring ones already delivered (e.g. by a retried job)."""
+    if not entries:
+        return 0
+    try:
+        return len(get_collection("timelines").insert_many(entries, ordered=False).inserted_ids)
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(error.get("code") != DUPLICATE_KEY for error in errors):
+            raise
+        return e.details.get("nInserted", 0)
+
+# -- large artists
+def large_artists():
+    """Ids of artists whose artworks are read on demand instead of fanned out."""
+    ids = large_artist_cache.get("ids")
+    if ids is None:
+        ids = {doc["_id"] for doc in get_collection("users").find(
+            {"followers_count": {"$gte": FANOUT_MAX_FOLLOWERS}}, {"_id": 1}
+        )}
+        large_artist_cache.set("ids", ids)
+    return ids
+
+def followed_large_artists(user_id):
+    large = large_artists()
+    if not large:
+        return []
+    return [doc["followee_id"] for doc in read_collection("follows").find(
+        {"follower_id": _to_object_id(user_id), "followee_id": {"$in": list(large)}}, {"followee_id": 1}
+    )]
+
+# -- writes
+def trim_timeline(user_id, size=TIMELINE_SIZE):
+    """Delete everything past the newest `size` entries of a user's timeline."""
+    oldest_kept = list(
+        get_collection("timelines").find({"user_id": user_id}, {"created_at": 1, "artwork_id": 1})
+        .sort(TIMELINE_SORT).skip(size - 1).limit(1)
+    )
+    if not oldest_kept:
+        return 0
+    created_at, artwork_id = oldest_kept[0]["created_at"], oldest_kept[0]["artwork_id"]
+    return get_collection("timelines").delete_many({"user_id": user_id, "$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "artwork_id": {"$lt": artwork_id}},
+    ]}).deleted_count
+
+def fan_out_batch(artwork_id, after=None, batch_size=FANOUT_BATCH_SIZE):
+    """Deliver an artwork to one batch of its artist's followers.
+
+    Returns the last follow _id handled, to pass as `after` for the next
+    batch, or None once every follower has it.
+    """
+    artwork = get_collection("artworks").find_one({"_id": _to_object_id(artwork_id)}, {"artist_id": 1, "created_at": 1})
+    if not artwork:
+        return None
+    artist_id = _to_object_id(artwork["artist_id"])
+    if artist_id in large_artists():
+        return None
+    follows = get_follower_batch(artist_id, after, batch_size)
+    _insert_entries([_entry(follow["follower_id"], artwork) for follow in follows])
+    for follow in follows:
+        if random.randrange(TIMELINE_TRIM_EVERY) == 0:
+            trim_timeline(follow["follower_id"])
+    return follows[-1]["_id"] if len(follows) == batch_size else None
+
+def backfill_timeline(user_id, artist_id, limit=TIMELINE_BACKFILL):
+    """Copy a newly followed artist's recent artworks into the follower's timeline."""
+    if _to_object_id(artist_id) in large_artists():
+        return 0
+    artworks = get_collection("artworks").find(
+        {"artist_id": str(artist_id)}, {"artist_id": 1, "created_at": 1}
+    ).sort(FEED_SORT).limit(limit)
+    user_id = _to_object_id(user_id)
+    inserted = _insert_entries([_entry(user_id, artwork) for artwork in artworks])
+    trim_timeline(user_id)
+    return inserted
+
+def remove_artist_from_timeline(user_id, artist_id):
+    """Drop an unfollowed artist's artworks from the user's timeline."""
+    return get_collection("timelines").delete_many(
+        {"user_id": _to_object_id(user_id), "artist_id": _to_object_id(artist_id)}
+    ).deleted_count
+
+# -- reads
+def _keyset(position, id_field):
+    created_at, oid = position
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, id_field: {"$lt": oid}},
+    ]}
+
+def get_timeline_page(user_id, cursor=None, limit=24):
+    """Return (artworks, next_cursor) for a user's timeline, newest first.
+
+    Fanned-out entries come from one query on the (user_id, created_at,
+    artwork_id) index; artworks of followed large artists are merged in from
+    the artist index. Cursors are compatible with models.feed.
+    """
+    user_id = _to_object_id(user_id)
+    position = decode_cursor(cursor) if cursor else None
+
+    filt = {"user_id": user_id}
+    if position:
+        filt.update(_keyset(position, "artwork_id"))
+    refs = {
+        entry["artwork_id"]: entry["created_at"]
+        for entry in read_collection("timelines").find(filt, {"_id": 0, "artwork_id": 1, "created_at": 1})
+        .sort(TIMELINE_SORT).limit(limit + 1)
+    }
+
+    pulled = followed_large_artists(user_id)
+    if pulled:
+        filt = {"artist_id": {"$in": [str(artist_id) for artist_id in pulled]}}
+        if position:
+            filt = {"$and": [filt, _keyset(position, "_id")]}
+        for artwork in read_collection("artworks").find(filt, {"created_at": 1}).sort(FEED_SORT).limit(limit + 1):
+            refs[artwork["_id"]] = artwork["created_at"]
+
+    ordered = sorted(refs.items(), key=lambda ref: (ref[1], ref[0]), reverse=True)
+    next_cursor = None
+    if len(ordered) > limit:
+        ordered = ordered[:limit]
+        artwork_id, created_at = ordered[-1]
+        next_cursor = encode_cursor({"_id": artwork_id, "created_at": created_at})
+
+    ids = [artwork_id for artwork_id, _ in ordered]
+    found = {
+        artwork["_id"]: artwork
+        for artwork in read_collection("artworks").find({"_id": {"$in": ids}}, Artwork.projection("card"))
+    }
+    # entries of artworks deleted since delivery are skipped
+    return Artwork.from_docs(found[artwork_id] for artwork_id in ids if artwork_id in found), next_cursor
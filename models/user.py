@@ -1,7 +1,21 @@
-from db import users_collection
+import os
+
+from db import get_collection
+from cache import TTLCache
+from models.records import UserSummary
 from bson.objectid import ObjectId
 from datetime import datetime, timezone
 
+user_cache = TTLCache(
+    maxsize=int(os.getenv("USER_CACHE_SIZE", 2048)),
+    ttl=float(os.getenv("USER_CACHE_TTL", 60)),
+)
+# artist chips for cards and comments, kept apart from the whole documents in user_cache
+summary_cache = TTLCache(
+    maxsize=int(os.getenv("USER_SUMMARY_CACHE_SIZE", 8192)),
+    ttl=float(os.getenv("USER_CACHE_TTL", 60)),
+)
+
 def add_user(username, email, password_hash):
     user_data = {
         "username": username,
@@ -13,22 +27,71 @@ def add_user(username, email, password_hash):
         "social_links": {},
         "created_at": datetime.now(timezone.utc)
     }
-    return users_collection.insert_one(user_data)
+    return get_collection("users").insert_one(user_data)
 
 def get_all_users():
-    return list(users_collection.find())
+    return list(get_collection("users").find())
 
 def get_user_by_email(email):
-    return users_collection.find_one({"email": email})
+    return get_collection("users").find_one({"email": email})
 
 def get_user_by_id(user_id):
+    """Look a user up by id, served from the per-process user cache when possible."""
+    key = str(user_id)
+    user = user_cache.get(key)
+    if user is not None:
+        return user
     try:
-        return users_collection.find_one({"_id": ObjectId(user_id)})
+        user = get_collection("users").find_one({"_id": ObjectId(user_id)})
     except:
         return None
+    if user:
+        user_cache.set(key, user)
+    return user
+
+def get_user_summaries(user_ids):
+    """Return {str(user_id): UserSummary}, fetching only the chip fields for cache misses."""
+    users, missing = cached_summaries(user_ids)
+    if missing:
+        add_summaries(users, get_collection("users").find(*summaries_query(missing)))
+    return users
+
+# shared with models/user_async.py, which only differs in how it queries
+def cached_summaries(user_ids):
+    """Split user_ids into ({str(user_id): UserSummary} from the caches, [ObjectId to fetch])."""
+    users = {}
+    missing = []
+    for user_id in {str(u) for u in user_ids}:
+        user = summary_cache.get(user_id)
+        if user is None:
+            full = user_cache.get(user_id)
+            if full is not None:
+                user = UserSummary.from_doc(full)
+                summary_cache.set(user_id, user)
+        if user is not None:
+            users[user_id] = user
+        elif ObjectId.is_valid(user_id):
+            missing.append(ObjectId(user_id))
+    return users, missing
+
+def summaries_query(missing):
+    """find() arguments for the chip fields of the users cached_summaries() missed."""
+    return {"_id": {"$in": missing}}, UserSummary.projection("chip")
+
+def add_summaries(users, docs):
+    for doc in docs:
+        user = UserSummary.from_doc(doc)
+        users[str(doc["_id"])] = user
+        summary_cache.set(str(doc["_id"]), user)
+    return users
+
+def invalidate_user(user_id):
+    user_cache.delete(str(user_id))
+    summary_cache.delete(str(user_id))
 
 def update_user(user_id, update_data):
-    users_collection.update_one(
+    get_collection("users").update_one(
         {"_id": ObjectId(user_id)},
         {"$set": update_data}
-    )
\ No newline at end of file
+    )
+    invalidate_user(user_id)
@@ -0,0 +1,25 @@
+# models/user_async.py
+from async_db import read_collection
+from models.user import add_summaries, cached_summaries, summaries_query, user_cache
+from bson.objectid import ObjectId
+
+# Async counterparts of models/user.py. They share the same user cache.
+async def get_user_by_id(user_id):
+    key = str(user_id)
+    user = user_cache.get(key)
+    if user is not None:
+        return user
+    try:
+        user = await read_collection("users").find_one({"_id": ObjectId(user_id)})
+    except:
+        return None
+    if user:
+        user_cache.set(key, user)
+    return user
+
+async def get_user_summaries(user_ids):
+    """Async version of models.user.get_user_summaries."""
+    users, missing = cached_summaries(user_ids)
+    if missing:
+        add_summaries(users, await read_collection("users").find(*summaries_query(missing)).to_list(length=None))
+    return users
@@ -0,0 +1,120 @@
+# render_cache.py
+import functools
+import os
+import time
+import uuid
+
+from flask import request, render_template, make_response
+from flask_login import current_user
+from markupsafe import Markup
+from werkzeug.http import is_resource_modified
+
+from cache import make_backend
+
+PAGE_CACHE_TTL = int(os.getenv("PAGE_CACHE_TTL", 30))
+CARD_CACHE_TTL = int(os.getenv("CARD_CACHE_TTL", 3600))
+CONTENT_VERSION_KEY = "version:content"
+
+backend = make_backend(os.getenv("CACHE_URL"))
+# scopes ETags to this process when version counters aren't shared
+INSTANCE_ID = uuid.uuid4().hex[:8]
+
+def reset_instance_id():
+    """Give a forked worker its own INSTANCE_ID; preloaded workers would share the master's."""
+    global INSTANCE_ID
+    INSTANCE_ID = uuid.uuid4().hex[:8]
+
+os.register_at_fork(after_in_child=reset_instance_id)
+
+# -- version stamps
+def content_version():
+    return backend.get_counter(CONTENT_VERSION_KEY)
+
+def bump_content_version():
+    """Invalidate every cached page. Called from the artwork, like and comment write routes."""
+    return backend.incr(CONTENT_VERSION_KEY)
+
+def page_etag():
+    """ETag for a page rendered at the current content version for the current viewer.
+
+    With the in-process backend other workers' writes don't bump this
+    process's counter, so the tag also rolls over every PAGE_CACHE_TTL
+    seconds, the same staleness bound the page cache already has.
+    """
+    viewer = current_user.id if current_user.is_authenticated else "anon"
+    stamp = str(content_version())
+    if not backend.shared:
+        stamp = f"{INSTANCE_ID}.{stamp}.{int(time.time() // max(PAGE_CACHE_TTL, 1))}"
+    return f"{stamp}-{viewer}"
+
+# -- artwork cards
+def _card_key(template, artwork):
+    stamp = artwork.get("updated_at") or artwork["created_at"]
+    return "card:{}:{}:{}:{}:{}:{}".format(
+        template,
+        artwork["_id"],
+        stamp.timestamp(),
+        artwork.get("likes_count", 0),
+        artwork.get("comments_count", 0),
+        (artwork.get("image_variants") or {}).get("hash", ""),
+    )
+
+def render_cards(artworks, template="artwork_card.html"):
+    """Attach pre-rendered card HTML to each artwork, rendering only cache misses.
+
+    Cards are keyed on the artwork id plus a stamp built from its
+    updated_at, counters and image variants, so any change produces a new key.
+    """
+    keys = [_card_key(template, artwork) for artwork in artworks]
+    for artwork, key, html in zip(artworks, keys, backend.get_many(keys)):
+        if html is None:
+            html = render_template(template, artwork=artwork)
+            backend.set(key, html, CARD_CACHE_TTL)
+        artwork["card_html"] = Markup(html)
+    return artworks
+
+# -- anonymous pages
+def cached_page(view):
+    """Serve anonymous GET requests from the page cache.
+
+    Keys include the content version, so a bump from any write route makes
+    every cached page miss on its next request. PAGE_CACHE_TTL=0 disables it.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if PAGE_CACHE_TTL <= 0 or request.method != 'GET' or current_user.is_authenticated:
+            return view(*args, **kwargs)
+
+        key = f"page:{content_version()}:{request.full_path}"
+        cached = backend.get(key)
+        if cached is not None:
+            mimetype, body = cached.split("\n", 1)
+            response = make_response(body)
+            response.mimetype = mimetype
+            return response
+
+        response = make_response(view(*args, **kwargs))
+        if response.status_code == 200:
+            backend.set(key, f"{response.mimetype}\n{response.get_data(as_text=True)}", PAGE_CACHE_TTL)
+        return response
+    return wrapper
+
+def conditional_page(view):
+    """Answer 304 Not Modified before running the view when the client's ETag is current."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if request.method != 'GET':
+            return view(*args, **kwargs)
+
+        etag = page_etag()
+        if not is_resource_modified(request.environ, etag=etag):
+            response = make_response('', 304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        response.vary.add('Cookie')
+        return response
+    return wrapper
@@ -101,9 +101,9 @@ $('#process_images').on('input', function() {
             return;
         }
 
-        if (!imageUrl) {
+        if (!imageUrl && !$('#image_file').val()) {
             e.preventDefault();
-            alert('Please provide an image URL for your artwork');
+            alert('Please provide an image URL or upload an image for your artwork');
             $('#image_url').focus();
             return;
         }
@@ -0,0 +1,76 @@
+// Live like/comment counts and new comments over Server-Sent Events (see live.py).
+// EventSource reconnects on its own; every connection starts with a counts snapshot.
+window.artfolioLive = (function() {
+    const MAX_ARTWORKS = 100;  // LIVE_MAX_ARTWORKS
+    let commentsSource = null;
+    let feedSource = null;
+    let feedIds = '';
+
+    function applyCounts(counts) {
+        const card = $('[data-live-artwork="' + counts.artwork_id + '"]');
+        if (counts.likes_count !== undefined) {
+            card.find('.live-likes-count').text(counts.likes_count);
+            $('#likeButton[data-artwork-id="' + counts.artwork_id + '"] .likes-count').text(counts.likes_count);
+        }
+        if (counts.comments_count !== undefined && commentsSource) {
+            $('#commentsCount').text(counts.comments_count);
+        }
+    }
+
+    function onCounts(e) {
+        applyCounts(JSON.parse(e.data));
+    }
+
+    function onComment(e) {
+        const comment = JSON.parse(e.data);
+        // later pages are still to be loaded, and will include it
+        if ($('#comment-' + comment.comment_id).length || $('#loadMoreComments').length) return;
+        const list = $('#commentsList');
+        if (!list.find('.comment').length) list.empty();
+        list.append(comment.html);
+    }
+
+    // Artwork page: counts and new comments for one artwork
+    function followArtwork(url) {
+        commentsSource = new EventSource(url);
+        commentsSource.addEventListener('counts', onCounts);
+        commentsSource.addEventListener('comment', onComment);
+    }
+
+    // Feed pages: one multiplexed stream for the cards on the page
+    function followCards() {
+        const ids = $('[data-live-artwork]').map(function() {
+            return $(this).data('live-artwork');
+        }).get().slice(-MAX_ARTWORKS).join(',');
+        if (!ids || ids === feedIds) return;
+        feedIds = ids;
+        if (feedSource) feedSource.close();
+        feedSource = new EventSource('/api/live?artworks=' + ids);
+        feedSource.addEventListener('counts', onCounts);
+    }
+
+    $(document).ready(function() {
+        if (!window.EventSource) return;
+        const section = $('#comments[data-live-url]');
+        if (section.length) {
+            followArtwork(section.data('live-url'));
+            return;
+        }
+        followCards();
+        // infinite scroll appends cards; follow them once the page settles
+        const grid = document.getElementById('artworkGrid');
+        if (grid && 'MutationObserver' in window) {
+            let timer = null;
+            new MutationObserver(function() {
+                clearTimeout(timer);
+                timer = setTimeout(followCards, 1000);
+            }).observe(grid, { childList: true });
+        }
+    });
+
+    return {
+        commentsConnected: function() {
+            return commentsSource !== null && commentsSource.readyState === EventSource.OPEN;
+        }
+    };
+})();
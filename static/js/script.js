@@ -46,7 +46,8 @@ $(document).ready(function() {
 
         $.ajax({
             url: `/api/artwork/${artworkId}/like`,
-            method: 'POST',
+            // PUT/DELETE are idempotent, so a double click or retry can't flip the like back
+            method: btn.hasClass('liked') ? 'DELETE' : 'PUT',
             success: function(response) {
                 if (response.success) {
                     if (response.liked) {
@@ -70,17 +71,82 @@ $(document).ready(function() {
             }
         });
     });
+    // Follow button AJAX
+    $('.follow-btn').click(function() {
+        const btn = $(this);
+        $.ajax({
+            url: `/api/user/${btn.data('user-id')}/follow`,
+            method: btn.hasClass('following') ? 'DELETE' : 'PUT',
+            success: function(response) {
+                if (response.success) {
+                    btn.toggleClass('following btn-outline-secondary', response.following)
+                       .toggleClass('btn-primary', !response.following)
+                       .text(response.following ? 'Following' : 'Follow');
+                    $('.followers-count').text(response.followers_count);
+                } else {
+                    alert('Error: ' + (response.error || 'Failed to follow.'));
+                }
+            },
+            error: function(xhr) {
+                alert('Error: ' + (xhr.responseJSON?.error || xhr.responseText));
+            }
+        });
+    });
+
     $('#profileTabs a').on('click', function (e) {
         e.preventDefault();
         $(this).tab('show');
     });
 
-    $('.artwork-card').on('click', function(e) {
+    $(document).on('click', '.artwork-card', function(e) {
         if (!$(e.target).closest('.like-btn').length && !$(e.target).is('.like-btn')) {
             window.location = $(this).find('a').attr('href');
         }
     });
 
+    // Infinite scroll
+    const grid = $('#artworkGrid');
+    const sentinel = document.getElementById('feedSentinel');
+    let loadingPage = false;
+    let observer = null;
+
+    function loadNextPage() {
+        const cursor = grid.data('next-cursor');
+        if (loadingPage || !cursor) return;
+        loadingPage = true;
+        $(sentinel).html('<i class="fas fa-spinner fa-spin"></i>');
+
+        $.ajax({
+            url: grid.data('page-url'),
+            method: 'GET',
+            data: { cursor: cursor },
+            success: function(response) {
+                if (response.success) {
+                    grid.append(response.html);
+                    grid.data('next-cursor', response.next_cursor || '');
+                }
+            },
+            complete: function() {
+                loadingPage = false;
+                $(sentinel).empty();
+                // Re-observe so a sentinel that is still on screen triggers the next page
+                if (observer) {
+                    observer.unobserve(sentinel);
+                    observer.observe(sentinel);
+                }
+            }
+        });
+    }
+
+    if (grid.length && sentinel && 'IntersectionObserver' in window) {
+        observer = new IntersectionObserver(function(entries) {
+            if (entries[0].isIntersecting) {
+                loadNextPage();
+            }
+        }, { rootMargin: '400px' });
+        observer.observe(sentinel);
+    }
+
 
 
 });
@@ -0,0 +1,48 @@
+# static_assets.py
+import hashlib
+import os
+import threading
+
+from flask import request
+
+STATIC_MAX_AGE = 365 * 24 * 3600
+
+_fingerprints = {}  # filename -> (mtime, hash)
+_lock = threading.Lock()
+
+def fingerprint(static_folder, filename):
+    """Short content hash of a static file, recomputed only when its mtime changes."""
+    path = os.path.join(static_folder, filename)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    with _lock:
+        cached = _fingerprints.get(filename)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:12]
+    with _lock:
+        _fingerprints[filename] = (mtime, digest)
+    return digest
+
+def init_app(app):
+    """Fingerprint url_for('static') URLs and serve fingerprinted assets as immutable.
+
+    The fingerprint is added as a `v` query argument rather than renamed
+    files, so there is no build step; a changed file gets a new URL.
+    """
+
+    @app.url_defaults
+    def add_static_fingerprint(endpoint, values):
+        if endpoint == 'static' and 'v' not in values and 'filename' in values:
+            digest = fingerprint(app.static_folder, values['filename'])
+            if digest:
+                values['v'] = digest
+
+    @app.after_request
+    def cache_fingerprinted_static(response):
+        if request.endpoint == 'static' and 'v' in request.args and response.status_code in (200, 304):
+            response.headers['Cache-Control'] = f'public, max-age={STATIC_MAX_AGE}, immutable'
+        return response
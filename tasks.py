@@ -0,0 +1,37 @@
+# tasks.py
+"""Side work queued by the write routes and run by jobs.py, off the request path."""
+
+import media
+from jobs import task
+from models.cleanup import cascade_artwork
+from models.ranking import refresh_ranking
+from models.timeline import backfill_timeline, fan_out_batch, remove_artist_from_timeline
+
+@task("process_artwork_image")
+def process_artwork_image(artwork_id, image_url):
+    if media.Image is None:
+        return  # without Pillow, cards keep using image_url
+    media.process_artwork_image(artwork_id, image_url)
+
+@task("cascade_delete_artwork")
+def cascade_delete_artwork(artwork_id):
+    cascade_artwork(artwork_id)
+
+@task("fan_out_artwork")
+def fan_out_artwork(artwork_id, after=None):
+    """Deliver a new artwork to one batch of followers, then queue the next batch."""
+    last = fan_out_batch(artwork_id, after)
+    if last is not None:
+        fan_out_artwork.delay(artwork_id=artwork_id, after=str(last))
+
+@task("backfill_timeline")
+def backfill_timeline_job(user_id, artist_id):
+    backfill_timeline(user_id, artist_id)
+
+@task("unfollow_timeline")
+def unfollow_timeline(user_id, artist_id):
+    remove_artist_from_timeline(user_id, artist_id)
+
+@task("refresh_ranking")
+def refresh_ranking_job(name):
+    refresh_ranking(name)